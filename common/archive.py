@@ -0,0 +1,176 @@
+from django.db import connection, transaction
+from recipes.models import Cuisine, Ingredient, Recipe, RecipeIngredient
+
+
+def archive_table(model):
+    return f"{model._meta.db_table}_archive"
+
+
+def ensure_archive_table(cursor, model):
+    # Archive tables carry the live columns without indexes or foreign keys;
+    # generated columns become plain ones.
+    archive = archive_table(model)
+    cursor.execute(
+        f"CREATE TABLE IF NOT EXISTS {archive} "
+        f"(LIKE {model._meta.db_table} INCLUDING DEFAULTS)"
+    )
+    cursor.execute(
+        f"ALTER TABLE {archive} ADD COLUMN IF NOT EXISTS "
+        "archived_at timestamp with time zone NOT NULL DEFAULT now()"
+    )
+
+
+def archived_columns(cursor, model):
+    """Writable columns of `model` that its archive table also has."""
+    existing = {
+        column.name
+        for column in connection.introspection.get_table_description(
+            cursor, archive_table(model)
+        )
+    }
+    return ", ".join(
+        field.column
+        for field in model._meta.concrete_fields
+        if not field.generated and field.column in existing
+    )
+
+
+def archive_batch(model, where, params, batch_size, child=None):
+    """
+    Move up to `batch_size` rows of `model` matching `where` into its
+    archive table in one statement, together with the rows of `child`, a
+    (model, foreign key column) pair, that reference them. Returns the
+    number of `model` rows moved.
+    """
+    table = model._meta.db_table
+
+    with transaction.atomic(), connection.cursor() as cursor:
+        columns = archived_columns(cursor, model)
+        ctes = [
+            f"batch AS (SELECT id FROM {table} WHERE {where} ORDER BY deleted_at "
+            "LIMIT %(limit)s FOR UPDATE SKIP LOCKED)"
+        ]
+
+        if child is not None:
+            child_model, column = child
+            child_columns = archived_columns(cursor, child_model)
+            ctes += [
+                f"child_moved AS (DELETE FROM {child_model._meta.db_table} "
+                f"WHERE {column} IN (SELECT id FROM batch) RETURNING {child_columns})",
+                f"child_archived AS (INSERT INTO {archive_table(child_model)} "
+                f"({child_columns}) SELECT {child_columns} FROM child_moved)",
+            ]
+
+        ctes += [
+            f"moved AS (DELETE FROM {table} WHERE id IN (SELECT id FROM batch) "
+            f"RETURNING {columns})",
+            f"archived AS (INSERT INTO {archive_table(model)} ({columns}) "
+            f"SELECT {columns} FROM moved RETURNING 1)",
+        ]
+
+        cursor.execute(
+            f"WITH {', '.join(ctes)} SELECT count(*) FROM archived",
+            {**params, "limit": batch_size},
+        )
+        return cursor.fetchone()[0]
+
+
+def archive_soft_deleted(cutoff, batch_size):
+    """
+    Move rows soft-deleted before `cutoff` out of the live tables. Recipes
+    take their ingredient lines along; cuisines and ingredients still
+    referenced by a live row stay where they are.
+    """
+    recipe = Recipe._meta.db_table
+    line = RecipeIngredient._meta.db_table
+    deleted = "is_active = false AND deleted_at < %(cutoff)s"
+
+    plan = [
+        (Recipe, deleted, (RecipeIngredient, "recipe_id")),
+        (RecipeIngredient, deleted, None),
+        (
+            Cuisine,
+            f"{deleted} AND NOT EXISTS (SELECT 1 FROM {recipe} "
+            f"WHERE {recipe}.cuisine_id = {Cuisine._meta.db_table}.id)",
+            None,
+        ),
+        (
+            Ingredient,
+            f"{deleted} AND NOT EXISTS (SELECT 1 FROM {line} "
+            f"WHERE {line}.ingredient_id = {Ingredient._meta.db_table}.id)",
+            None,
+        ),
+    ]
+
+    with connection.cursor() as cursor:
+        for model in (Recipe, RecipeIngredient, Cuisine, Ingredient):
+            ensure_archive_table(cursor, model)
+
+    moved = {}
+    for model, where, child in plan:
+        moved[model._meta.label] = 0
+        while True:
+            count = archive_batch(model, where, {"cutoff": cutoff}, batch_size, child)
+            moved[model._meta.label] += count
+            if count < batch_size:
+                break
+
+    return moved
+
+
+def restore_archived(model, **lookup):
+    """
+    Move archived rows of `model` matching `lookup` back into the live
+    table, still soft-deleted, so the usual reactivation path finds them.
+    Nothing is restored while a live row matches `lookup`.
+    """
+    table = model._meta.db_table
+    archive = archive_table(model)
+
+    with transaction.atomic(), connection.cursor() as cursor:
+        cursor.execute("SELECT to_regclass(%s)", [archive])
+        if cursor.fetchone()[0] is None:
+            return 0
+
+        columns = archived_columns(cursor, model)
+        where = " AND ".join(
+            f"{model._meta.get_field(name).column} = %s" for name in lookup
+        )
+        cursor.execute(
+            f"WITH restored AS (DELETE FROM {archive} WHERE {where} "
+            f"AND NOT EXISTS (SELECT 1 FROM {table} WHERE {where}) "
+            f"RETURNING {columns}) "
+            f"INSERT INTO {table} ({columns}) SELECT {columns} FROM restored",
+            [*lookup.values(), *lookup.values()],
+        )
+        return cursor.rowcount
+
+
+def restore_archived_names(model, tenant_id, names):
+    """
+    Like restore_archived, for every name in `names` of one tenant in one
+    statement. Where a name was archived more than once, the most recently
+    archived row comes back.
+    """
+    table = model._meta.db_table
+    archive = archive_table(model)
+
+    with transaction.atomic(), connection.cursor() as cursor:
+        cursor.execute("SELECT to_regclass(%s)", [archive])
+        if cursor.fetchone()[0] is None:
+            return 0
+
+        columns = archived_columns(cursor, model)
+        cursor.execute(
+            f"WITH picked AS (SELECT DISTINCT ON (name) id FROM {archive} "
+            "WHERE tenant_id = %(tenant)s AND name = ANY(%(names)s) "
+            f"AND NOT EXISTS (SELECT 1 FROM {table} live "
+            f"WHERE live.tenant_id = {archive}.tenant_id "
+            f"AND live.name = {archive}.name) "
+            "ORDER BY name, archived_at DESC), "
+            f"restored AS (DELETE FROM {archive} WHERE id IN (SELECT id FROM picked) "
+            f"RETURNING {columns}) "
+            f"INSERT INTO {table} ({columns}) SELECT {columns} FROM restored",
+            {"tenant": tenant_id, "names": list(names)},
+        )
+        return cursor.rowcount
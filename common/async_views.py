@@ -0,0 +1,114 @@
+from django.core.exceptions import ValidationError as DjangoValidationError
+from django.http import Http404, JsonResponse
+from django.views import View
+from rest_framework.exceptions import (
+    APIException,
+    AuthenticationFailed,
+    NotAuthenticated,
+    NotFound,
+    PermissionDenied,
+)
+from rest_framework.permissions import IsAuthenticated
+from rest_framework.request import Request
+from rest_framework import status
+from .authentication import AsyncJWTAuthentication
+from .db_router import ais_pinned, reset_replica, use_replica
+
+
+class AsyncReadView(View):
+    """
+    Native async GET endpoint for ASGI deployments. The user lookup and all
+    queries go through the async ORM, so a request waiting on the database
+    or on a slow client does not hold a worker thread.
+
+    Subclasses implement `list` and/or `retrieve`, returning the response
+    data. Querysets and serializers come from `viewset_class`, so the
+    payloads match the sync endpoints, and errors are rendered the same way
+    as by `common.exceptions.custom_api_exception_handler`.
+    """
+
+    http_method_names = ["get"]
+    authentication = AsyncJWTAuthentication()
+    permission_classes = [IsAuthenticated]
+    viewset_class = None
+
+    def setup(self, request, *args, **kwargs):
+        super().setup(request, *args, **kwargs)
+        self.viewset = self.viewset_class() if self.viewset_class else None
+
+    async def get(self, request, pk=None):
+        token = None
+        try:
+            request = await self.initialize_request(request)
+            self.check_permissions(request)
+
+            if not await ais_pinned(request.user):
+                token = use_replica()
+
+            if pk is None:
+                data = await self.list(request)
+            else:
+                data = await self.retrieve(request, pk)
+        except Http404 as exc:
+            return self.handle_exception(request, NotFound(*exc.args))
+        except APIException as exc:
+            return self.handle_exception(request, exc)
+        except DjangoValidationError as exc:
+            return JsonResponse(
+                exc.message_dict if hasattr(exc, "message_dict") else exc.messages,
+                status=status.HTTP_400_BAD_REQUEST,
+                safe=False,
+            )
+        finally:
+            if token is not None:
+                reset_replica(token)
+
+        return JsonResponse(data, safe=False)
+
+    async def list(self, request):
+        raise NotImplementedError
+
+    async def retrieve(self, request, pk):
+        raise NotImplementedError
+
+    async def initialize_request(self, request):
+        # The DRF Request supplies query_params and friends to the shared
+        # viewset code; authentication happens here, not through it.
+        drf_request = Request(request, authenticators=())
+
+        result = await self.authentication.aauthenticate(request)
+        if result is not None:
+            drf_request.user, drf_request.auth = result
+
+        return drf_request
+
+    def get_permissions(self):
+        return [permission() for permission in self.permission_classes]
+
+    def check_permissions(self, request):
+        for permission in self.get_permissions():
+            if not permission.has_permission(request, self):
+                self.permission_denied(request, permission)
+
+    def check_object_permissions(self, request, obj):
+        for permission in self.get_permissions():
+            if not permission.has_object_permission(request, self, obj):
+                self.permission_denied(request, permission)
+
+    def permission_denied(self, request, permission):
+        if request.auth is None:
+            raise NotAuthenticated()
+        raise PermissionDenied(getattr(permission, "message", None))
+
+    def handle_exception(self, request, exc):
+        if isinstance(exc.detail, (list, dict)):
+            data = exc.detail
+        else:
+            data = {"detail": exc.detail}
+
+        response = JsonResponse(data, status=exc.status_code, safe=False)
+        if isinstance(exc, (NotAuthenticated, AuthenticationFailed)):
+            response["WWW-Authenticate"] = self.authentication.authenticate_header(
+                request
+            )
+        return response
@@ -0,0 +1,187 @@
+import hashlib
+from functools import wraps
+from django.core.cache import cache
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date, quote_etag
+from rest_framework import status
+from rest_framework.response import Response
+from users.enums import UserRole
+from .constants import RESPONSE_CACHE_TTL
+from .db_router import reset_replica, use_replica
+
+CACHE_PREFIX = "response-cache"
+
+
+def version_key(namespace, tenant_id):
+    return f"{CACHE_PREFIX}:version:{namespace}:{tenant_id}"
+
+
+def stats_key(namespace, outcome):
+    return f"{CACHE_PREFIX}:stats:{namespace}:{outcome}"
+
+
+def _incr(key, initial):
+    try:
+        return cache.incr(key)
+    except ValueError:
+        if cache.add(key, initial, timeout=None):
+            return initial
+        return cache.incr(key)
+
+
+def get_version(namespace, tenant_id):
+    version = cache.get(version_key(namespace, tenant_id))
+    if version is None:
+        cache.add(version_key(namespace, tenant_id), 1, timeout=None)
+        version = cache.get(version_key(namespace, tenant_id), 1)
+    return version
+
+
+def bump_version(tenant_id, *namespaces):
+    """
+    Invalidate every cached response of `namespaces` for a tenant. Old keys
+    are never read again and simply expire.
+    """
+    for namespace in namespaces:
+        _incr(version_key(namespace, tenant_id), 2)
+
+
+def record(namespace, outcome):
+    _incr(stats_key(namespace, outcome), 1)
+
+
+def get_stats(namespaces):
+    keys = {
+        (namespace, outcome): stats_key(namespace, outcome)
+        for namespace in namespaces
+        for outcome in ("hits", "misses")
+    }
+    values = cache.get_many(list(keys.values()))
+    return {
+        namespace: {
+            outcome: values.get(keys[(namespace, outcome)], 0)
+            for outcome in ("hits", "misses")
+        }
+        for namespace in namespaces
+    }
+
+
+def response_key(namespace, request, per_user, embeds=()):
+    user = request.user
+    version = get_version(namespace, user.tenant_id)
+    versions = [get_version(embed, user.tenant_id) for embed in embeds]
+    owner = user.id if per_user and user.role != UserRole.ADMIN else "-"
+    params = sorted(
+        (key, value) for key, values in request.query_params.lists() for value in values
+    )
+    digest = hashlib.sha1(repr(params).encode()).hexdigest()
+    return ":".join(
+        str(part)
+        for part in (
+            CACHE_PREFIX,
+            namespace,
+            user.tenant_id,
+            version,
+            *versions,
+            user.role,
+            owner,
+            digest,
+        )
+    )
+
+
+def cache_response(namespace, per_user=False, embeds=()):
+    """
+    Cache a viewset list action's response data per tenant, role and query
+    params. With `per_user`, non-admin responses are also keyed by user,
+    for endpoints whose results depend on ownership. Writes to any of the
+    `embeds` namespaces invalidate the cached responses too.
+    """
+
+    def decorator(method):
+        @wraps(method)
+        def wrapper(self, request, *args, **kwargs):
+            key = response_key(namespace, request, per_user, embeds)
+
+            data = cache.get(key)
+            if data is not None:
+                record(namespace, "hits")
+                response = Response(data, status=status.HTTP_200_OK)
+                response["X-Cache"] = "HIT"
+                return response
+
+            record(namespace, "misses")
+            # Fill from the primary: a lagging replica could store pre-write
+            # rows under the post-write version.
+            token = use_replica(False)
+            try:
+                response = method(self, request, *args, **kwargs)
+            finally:
+                reset_replica(token)
+            if response.status_code == status.HTTP_200_OK:
+                cache.set(key, response.data, timeout=RESPONSE_CACHE_TTL)
+            response["X-Cache"] = "MISS"
+            return response
+
+        return wrapper
+
+    return decorator
+
+
+def make_etag(namespace, request, pk, updated_at, embeds=()):
+    versions = [get_version(embed, request.user.tenant_id) for embed in embeds]
+    raw = ":".join(
+        str(part)
+        for part in (
+            namespace,
+            pk,
+            updated_at.isoformat(),
+            *versions,
+            request.user.role,
+        )
+    )
+    return quote_etag(hashlib.sha1(raw.encode()).hexdigest())
+
+
+def conditional_detail(namespace, embeds=()):
+    """
+    Answer If-None-Match / If-Modified-Since on a viewset retrieve action
+    from an updated_at-only query, before the full object is loaded and
+    serialized. The ETag is built from the object's own updated_at plus
+    the cache versions of the `embeds` namespaces whose data the
+    representation includes, so unrelated writes in the tenant keep it
+    valid. Last-Modified cannot see embedded changes and is only sent for
+    representations that embed nothing.
+    """
+
+    def decorator(method):
+        @wraps(method)
+        def wrapper(self, request, pk=None, *args, **kwargs):
+            updated_at = (
+                self.get_queryset(request)
+                .filter(pk=pk)
+                .values_list("updated_at", flat=True)
+                .first()
+            )
+            if updated_at is None:
+                return method(self, request, pk, *args, **kwargs)
+
+            etag = make_etag(namespace, request, pk, updated_at, embeds)
+            last_modified = None if embeds else int(updated_at.timestamp())
+
+            not_modified = get_conditional_response(
+                request, etag=etag, last_modified=last_modified
+            )
+            if not_modified is not None:
+                return not_modified
+
+            response = method(self, request, pk, *args, **kwargs)
+            if response.status_code == status.HTTP_200_OK:
+                response["ETag"] = etag
+                if last_modified is not None:
+                    response["Last-Modified"] = http_date(last_modified)
+            return response
+
+        return wrapper
+
+    return decorator
@@ -6,3 +6,36 @@ REFRESH_TOKEN_LIFETIME = timedelta(days=1)
 DEFAULT_PAGE_SIZE = 5
 DEFAULT_MAX_PAGE_SIZE = 100
 DEFAULT_PAGE_SIZE_QUERY_PARAM = "page_size"
+
+PAGINATION_QUERY_PARAM = "pagination"
+CURSOR_PAGINATION = "cursor"
+CURSOR_QUERY_PARAM = "cursor"
+ORDERING_QUERY_PARAM = "ordering"
+
+AUTOCOMPLETE_DEFAULT_LIMIT = 10
+AUTOCOMPLETE_MAX_LIMIT = 50
+AUTOCOMPLETE_CACHE_TTL = 60
+
+RESPONSE_CACHE_TTL = 300
+CUISINES_CACHE_NAMESPACE = "cuisines"
+INGREDIENTS_CACHE_NAMESPACE = "ingredients"
+RECIPES_CACHE_NAMESPACE = "recipes"
+# Bumped when cuisine and ingredient active_recipe_counts change. Kept apart
+# from the catalog namespaces so recipe writes do not reload the catalogs.
+RECIPE_USAGE_CACHE_NAMESPACE = "recipe-usage"
+CATALOG_CACHE_MAX_TENANTS = 256
+
+BULK_CREATE_MAX_ITEMS = 1000
+
+EXPORT_CHUNK_SIZE = 2000
+
+REPLICA_ALIAS_PREFIX = "replica_"
+REPLICA_STICKY_SECONDS = 15
+REPLICA_HEALTH_CHECK_INTERVAL = 30
+REPLICA_MAX_LAG_SECONDS = 30
+
+ARCHIVE_AFTER_DAYS = 30
+ARCHIVE_BATCH_SIZE = 1000
+
+STATS_TOP_INGREDIENTS = 10
+STATS_CREATION_DAYS = 30
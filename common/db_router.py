@@ -0,0 +1,130 @@
+import random
+import time
+from contextvars import ContextVar
+from django.conf import settings
+from django.core.cache import cache
+from django.db import DatabaseError, connections
+from rest_framework.permissions import SAFE_METHODS
+from .constants import (
+    REPLICA_ALIAS_PREFIX,
+    REPLICA_HEALTH_CHECK_INTERVAL,
+    REPLICA_MAX_LAG_SECONDS,
+    REPLICA_STICKY_SECONDS,
+)
+
+PRIMARY = "default"
+
+# Set for the duration of a safe request on an opted-in view. Reads
+# outside such a request (writes, Celery tasks, commands) use the primary.
+_use_replica = ContextVar("use_replica", default=False)
+
+# alias -> (healthy, checked_at), per process.
+_health = {}
+
+
+def pin_key(user_id):
+    return f"db:pin-primary:{user_id}"
+
+
+def pin_to_primary(user):
+    """Send `user`'s reads to the primary while replicas catch up."""
+    cache.set(pin_key(user.id), True, timeout=REPLICA_STICKY_SECONDS)
+
+
+def is_pinned(user):
+    return user.is_authenticated and bool(cache.get(pin_key(user.id)))
+
+
+async def ais_pinned(user):
+    return user.is_authenticated and bool(await cache.aget(pin_key(user.id)))
+
+
+def use_replica(enabled=True):
+    return _use_replica.set(enabled)
+
+
+def reset_replica(token):
+    _use_replica.reset(token)
+
+
+def replica_aliases():
+    return [
+        alias for alias in settings.DATABASES if alias.startswith(REPLICA_ALIAS_PREFIX)
+    ]
+
+
+def is_healthy(alias):
+    if alias in _health:
+        healthy, checked_at = _health[alias]
+        if time.monotonic() - checked_at < REPLICA_HEALTH_CHECK_INTERVAL:
+            return healthy
+
+    try:
+        with connections[alias].cursor() as cursor:
+            # NULL outside recovery, i.e. when the "replica" is a primary.
+            cursor.execute(
+                "SELECT COALESCE(EXTRACT(EPOCH FROM "
+                "now() - pg_last_xact_replay_timestamp()), 0)"
+            )
+            lag = cursor.fetchone()[0]
+        healthy = lag <= REPLICA_MAX_LAG_SECONDS
+    except DatabaseError:
+        connections[alias].close()
+        healthy = False
+
+    _health[alias] = (healthy, time.monotonic())
+    return healthy
+
+
+class PrimaryReplicaRouter:
+    """
+    Send reads of opted-in safe requests to a healthy replica and everything
+    else to the primary. Replicas are the DATABASES entries prefixed with
+    REPLICA_ALIAS_PREFIX; with none configured every query hits the primary.
+    """
+
+    def db_for_read(self, model, **hints):
+        if not _use_replica.get():
+            return PRIMARY
+
+        replicas = [alias for alias in replica_aliases() if is_healthy(alias)]
+        if not replicas:
+            return PRIMARY
+        return random.choice(replicas)
+
+    def db_for_write(self, model, **hints):
+        return PRIMARY
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # Replicas hold the same data as the primary.
+        return True
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        return db == PRIMARY
+
+
+class ReplicaReadMixin:
+    """
+    Viewset mixin routing safe requests to the replicas, unless the user
+    wrote recently. Successful writes pin the user to the primary for
+    REPLICA_STICKY_SECONDS so they read their own changes.
+    """
+
+    def initial(self, request, *args, **kwargs):
+        super().initial(request, *args, **kwargs)
+        if request.method in SAFE_METHODS and not is_pinned(request.user):
+            self.replica_token = use_replica()
+
+    def finalize_response(self, request, response, *args, **kwargs):
+        token = getattr(self, "replica_token", None)
+        if token is not None:
+            reset_replica(token)
+            self.replica_token = None
+        elif (
+            request.method not in SAFE_METHODS
+            and response.status_code < 400
+            and request.user.is_authenticated
+        ):
+            pin_to_primary(request.user)
+
+        return super().finalize_response(request, response, *args, **kwargs)
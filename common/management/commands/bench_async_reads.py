@@ -0,0 +1,104 @@
+import asyncio
+import statistics
+import time
+from urllib.parse import urlsplit
+from django.core.management.base import BaseCommand, CommandError
+
+DEFAULT_PATHS = ["/api/v1/recipes/", "/api/v1/cuisines/", "/api/v1/ingredients/"]
+
+
+class Command(BaseCommand):
+    help = (
+        "Compare latency and throughput of the sync read endpoints and their "
+        "/api/v1/async/ counterparts. Run the project under a WSGI server for "
+        "--sync-url and under an ASGI server for --async-url."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--sync-url", default="http://127.0.0.1:8000")
+        parser.add_argument("--async-url", default="http://127.0.0.1:8001")
+        parser.add_argument("--token", required=True, help="JWT access token")
+        parser.add_argument(
+            "--path",
+            action="append",
+            help=f"Sync endpoint to compare; repeatable. Default: {DEFAULT_PATHS}",
+        )
+        parser.add_argument("--requests", type=int, default=1000)
+        parser.add_argument("--concurrency", type=int, default=100)
+
+    def handle(self, *args, **options):
+        if options["requests"] < 2:
+            raise CommandError("--requests must be at least 2")
+
+        for path in options["path"] or DEFAULT_PATHS:
+            async_path = path.replace("/api/v1/", "/api/v1/async/", 1)
+
+            for label, url in (
+                ("sync", options["sync_url"] + path),
+                ("async", options["async_url"] + async_path),
+            ):
+                latencies, failures, elapsed = asyncio.run(
+                    self.run(
+                        url,
+                        options["token"],
+                        options["requests"],
+                        options["concurrency"],
+                    )
+                )
+                percentiles = statistics.quantiles(latencies, n=100)
+                self.stdout.write(
+                    f"{label:>5} {url}: "
+                    f"{len(latencies) / elapsed:.0f} req/s, "
+                    f"p50 {percentiles[49] * 1000:.1f} ms, "
+                    f"p95 {percentiles[94] * 1000:.1f} ms, "
+                    f"p99 {percentiles[98] * 1000:.1f} ms, "
+                    f"{failures} non-200"
+                )
+
+    async def run(self, url, token, total, concurrency):
+        semaphore = asyncio.Semaphore(concurrency)
+        latencies = []
+
+        async def request():
+            async with semaphore:
+                started = time.perf_counter()
+                try:
+                    status = await self.fetch(url, token)
+                except (OSError, IndexError, ValueError):
+                    status = None
+                latencies.append(time.perf_counter() - started)
+                return status
+
+        started = time.perf_counter()
+        statuses = await asyncio.gather(*(request() for _ in range(total)))
+        elapsed = time.perf_counter() - started
+
+        failures = sum(1 for status in statuses if status != 200)
+        return latencies, failures, elapsed
+
+    async def fetch(self, url, token):
+        # A bare HTTP/1.1 client keeps the benchmark free of extra
+        # dependencies; one connection per request, read to EOF.
+        parts = urlsplit(url)
+        secure = parts.scheme == "https"
+        reader, writer = await asyncio.open_connection(
+            parts.hostname, parts.port or (443 if secure else 80), ssl=secure
+        )
+
+        target = parts.path + (f"?{parts.query}" if parts.query else "")
+        writer.write(
+            (
+                f"GET {target} HTTP/1.1\r\n"
+                f"Host: {parts.netloc}\r\n"
+                f"Authorization: Bearer {token}\r\n"
+                "Connection: close\r\n\r\n"
+            ).encode()
+        )
+        await writer.drain()
+
+        status_line = await reader.readline()
+        await reader.read()
+        writer.close()
+        await writer.wait_closed()
+
+        return int(status_line.split()[1])
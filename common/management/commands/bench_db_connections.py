@@ -0,0 +1,55 @@
+import statistics
+import time
+import psycopg
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+
+
+class Command(BaseCommand):
+    help = (
+        "Measure the per-request cost of a fresh Postgres connection against "
+        "the configured one (pooled or persistent)"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--requests", type=int, default=200)
+
+    def handle(self, *args, **options):
+        if options["requests"] < 2:
+            raise CommandError("--requests must be at least 2")
+
+        params = connection.get_connection_params()
+
+        def fresh():
+            with psycopg.connect(**params) as conn:
+                conn.execute("SELECT 1")
+
+        def configured():
+            # What a request does: borrow (or reuse) a connection, query,
+            # and release it as the request_finished handler would.
+            with connection.cursor() as cursor:
+                cursor.execute("SELECT 1")
+            connection.close_if_unusable_or_obsolete()
+
+        results = {}
+        for label, request in (("fresh", fresh), ("configured", configured)):
+            request()
+            timings = []
+            for _ in range(options["requests"]):
+                started = time.perf_counter()
+                request()
+                timings.append(time.perf_counter() - started)
+
+            percentiles = statistics.quantiles(timings, n=100)
+            results[label] = percentiles[49]
+            self.stdout.write(
+                f"{label:>10}: p50 {percentiles[49] * 1000:.2f} ms, "
+                f"p95 {percentiles[94] * 1000:.2f} ms"
+            )
+
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Connect cost removed per request: "
+                f"{(results['fresh'] - results['configured']) * 1000:.2f} ms (p50)"
+            )
+        )
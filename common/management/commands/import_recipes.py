@@ -0,0 +1,339 @@
+import csv
+import json
+import uuid
+from decimal import Decimal, InvalidOperation
+from pathlib import Path
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from recipes.counters import recipes_activated
+from recipes.enums import SharingStatus
+from recipes.models import Cuisine, Ingredient, Recipe, RecipeIngredient
+from tenants.models import Tenant
+from users.models import User
+from common.archive import restore_archived_names
+from common.cache import bump_version
+from common.constants import (
+    CUISINES_CACHE_NAMESPACE,
+    INGREDIENTS_CACHE_NAMESPACE,
+    RECIPES_CACHE_NAMESPACE,
+)
+
+NAME_MAX_LENGTH = 100
+UNIT_MAX_LENGTH = 50
+# Bounds of the columns the rows are copied into: a positive integer and
+# numeric(10, 2).
+COOKING_TIME_MAX = 2**31 - 1
+QUANTITY_MAX_DIGITS = 10
+QUANTITY_DECIMAL_PLACES = 2
+
+
+def parse_is_active(value):
+    """The export's is_active column, as written by the NDJSON or CSV export."""
+    if value is None or value == "":
+        return True
+    if isinstance(value, bool):
+        return value
+    if isinstance(value, str) and value.lower() in ("true", "false"):
+        return value.lower() == "true"
+    raise ValueError
+
+
+class Command(BaseCommand):
+    help = (
+        "Import recipes for a tenant from a CSV or NDJSON file (the /recipes/export/ "
+        "layout), loading them through COPY into staging tables. Recipes exported "
+        "as deleted are imported soft-deleted; the cuisines and ingredients of "
+        "active ones are reactivated if they were deleted"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("file")
+        parser.add_argument("--tenant", required=True, help="Tenant id")
+        parser.add_argument("--user", required=True, help="Email of the recipe owner")
+        parser.add_argument("--format", choices=["csv", "ndjson"])
+        parser.add_argument("--batch-size", type=int, default=5000)
+        parser.add_argument(
+            "--resume",
+            action="store_true",
+            help="Skip the records committed by a previous run of this file.",
+        )
+
+    def handle(self, *args, **options):
+        path = Path(options["file"])
+        if not path.exists():
+            raise CommandError(f"{path} does not exist")
+
+        file_format = options["format"] or path.suffix.lstrip(".").lower()
+        if file_format not in ("csv", "ndjson"):
+            raise CommandError("Cannot infer the format; pass --format csv|ndjson")
+
+        try:
+            self.tenant = Tenant.objects.get(id=options["tenant"], is_active=True)
+            self.user = User.objects.get(
+                email=options["user"].lower(), tenant=self.tenant, is_active=True
+            )
+        except (Tenant.DoesNotExist, User.DoesNotExist, ValueError):
+            raise CommandError("Unknown tenant, or user not active in that tenant")
+
+        progress_path = path.with_name(path.name + ".progress")
+        skip = 0
+        if options["resume"] and progress_path.exists():
+            skip = int(progress_path.read_text())
+            self.stdout.write(f"Resuming after record {skip}")
+
+        self.imported = 0
+        self.duplicates = 0
+        self.invalid = 0
+
+        batch = []
+        position = skip
+        for position, record in enumerate(self.read(path, file_format), start=1):
+            if position <= skip:
+                continue
+
+            row = self.clean(position, record)
+            if row is not None:
+                batch.append(row)
+
+            if len(batch) >= options["batch_size"]:
+                self.load(batch)
+                progress_path.write_text(str(position))
+                self.report(position)
+                batch = []
+
+        if batch:
+            self.load(batch)
+        progress_path.write_text(str(position))
+        self.report(position)
+        self.stdout.write(self.style.SUCCESS("Done"))
+
+    def report(self, position):
+        self.stdout.write(
+            f"Record {position}: {self.imported} imported, "
+            f"{self.duplicates} already present, {self.invalid} invalid"
+        )
+
+    def read(self, path, file_format):
+        with path.open(newline="", encoding="utf-8") as handle:
+            if file_format == "csv":
+                for record in csv.DictReader(handle):
+                    ingredients = record.get("ingredients") or "[]"
+                    record["ingredients"] = json.loads(ingredients)
+                    yield record
+            else:
+                for line in handle:
+                    if line.strip():
+                        yield json.loads(line)
+
+    def clean(self, position, record):
+        try:
+            name = (record.get("name") or "").strip()
+            cuisine = (record.get("cuisine") or "").strip() or None
+            sharing_status = record.get("sharing_status") or SharingStatus.PRIVATE
+            is_active = parse_is_active(record.get("is_active"))
+            if (
+                not name
+                or len(name) > NAME_MAX_LENGTH
+                or (cuisine and len(cuisine) > NAME_MAX_LENGTH)
+                or sharing_status not in SharingStatus.values
+            ):
+                raise ValueError
+
+            lines = {}
+            for line in record.get("ingredients") or []:
+                ingredient = line["name"].strip()
+                unit = line["unit"].strip()
+                if (
+                    not ingredient
+                    or len(ingredient) > NAME_MAX_LENGTH
+                    or len(unit) > UNIT_MAX_LENGTH
+                ):
+                    raise ValueError
+                quantity = Decimal(str(line["quantity"]))
+                if not self.fits_quantity(quantity):
+                    raise ValueError
+                lines[ingredient] = (quantity, unit)
+
+            cooking_time = int(record["cooking_time"])
+            if not 0 <= cooking_time <= COOKING_TIME_MAX:
+                raise ValueError
+
+            return {
+                "id": uuid.uuid4(),
+                "name": name,
+                "description": record.get("description") or "",
+                "preparation_steps": record.get("preparation_steps") or "",
+                "cooking_time": cooking_time,
+                "sharing_status": sharing_status,
+                "is_active": is_active,
+                "cuisine": cuisine,
+                "lines": lines,
+            }
+        except (KeyError, TypeError, ValueError, AttributeError, InvalidOperation):
+            self.invalid += 1
+            self.stderr.write(f"Skipping invalid record {position}")
+            return None
+
+    def fits_quantity(self, quantity):
+        """Whether the API would accept `quantity` for a numeric(10, 2) column."""
+        if not quantity.is_finite():
+            return False
+        _, digits, exponent = quantity.as_tuple()
+        decimals = max(0, -exponent)
+        whole_digits = max(0, len(digits) + exponent)
+        return (
+            decimals <= QUANTITY_DECIMAL_PLACES
+            and whole_digits <= QUANTITY_MAX_DIGITS - QUANTITY_DECIMAL_PLACES
+        )
+
+    def resolve(self, model, names, live_names):
+        """
+        Map names to ids for the tenant, creating missing rows in one insert.
+        Archived rows are restored first, and soft-deleted rows named in
+        `live_names` are reactivated, as the API does when a deleted row is
+        created again, so active recipes never point at deleted rows.
+        """
+        names = set(names)
+        if not names:
+            return {}
+
+        restore_archived_names(model, self.tenant.id, names)
+        model.objects.bulk_create(
+            [model(tenant=self.tenant, name=name) for name in names],
+            ignore_conflicts=True,
+        )
+        model.objects.filter(
+            tenant=self.tenant, name__in=set(live_names), is_active=False
+        ).restore()
+        return dict(
+            model.objects.filter(tenant=self.tenant, name__in=names).values_list(
+                "name", "id"
+            )
+        )
+
+    @transaction.atomic
+    def load(self, batch):
+        live = [row for row in batch if row["is_active"]]
+        cuisines = self.resolve(
+            Cuisine,
+            (row["cuisine"] for row in batch if row["cuisine"]),
+            (row["cuisine"] for row in live if row["cuisine"]),
+        )
+        ingredients = self.resolve(
+            Ingredient,
+            (name for row in batch for name in row["lines"]),
+            (name for row in live for name in row["lines"]),
+        )
+        # Each committed batch may add catalog rows, so processes holding a
+        # tenant catalog must reload it before rendering the new recipes.
+        transaction.on_commit(
+            lambda: bump_version(
+                self.tenant.id,
+                CUISINES_CACHE_NAMESPACE,
+                INGREDIENTS_CACHE_NAMESPACE,
+                RECIPES_CACHE_NAMESPACE,
+            )
+        )
+
+        with connection.cursor() as cursor:
+            cursor.execute(
+                """
+                CREATE TEMP TABLE import_recipe (
+                    id uuid,
+                    name varchar(100),
+                    description text,
+                    preparation_steps text,
+                    cooking_time integer,
+                    sharing_status varchar(20),
+                    is_active boolean,
+                    cuisine_id uuid,
+                    ingredient_ids uuid[]
+                ) ON COMMIT DROP;
+                CREATE TEMP TABLE import_recipe_ingredient (
+                    recipe_id uuid,
+                    ingredient_id uuid,
+                    quantity numeric(10, 2),
+                    unit varchar(50)
+                ) ON COMMIT DROP;
+                """
+            )
+
+            with cursor.copy(
+                "COPY import_recipe (id, name, description, preparation_steps, "
+                "cooking_time, sharing_status, is_active, cuisine_id, ingredient_ids) "
+                "FROM STDIN"
+            ) as copy:
+                for row in batch:
+                    copy.write_row(
+                        (
+                            row["id"],
+                            row["name"],
+                            row["description"],
+                            row["preparation_steps"],
+                            row["cooking_time"],
+                            row["sharing_status"],
+                            row["is_active"],
+                            cuisines.get(row["cuisine"]),
+                            [ingredients[name] for name in row["lines"]],
+                        )
+                    )
+
+            with cursor.copy(
+                "COPY import_recipe_ingredient (recipe_id, ingredient_id, quantity, "
+                "unit) FROM STDIN"
+            ) as copy:
+                for row in batch:
+                    for name, (quantity, unit) in row["lines"].items():
+                        copy.write_row((row["id"], ingredients[name], quantity, unit))
+
+            # Recipes whose name already exists in the tenant are skipped,
+            # which also makes re-running a half-committed batch safe.
+            cursor.execute(
+                f"""
+                WITH inserted AS (
+                    INSERT INTO {Recipe._meta.db_table} (
+                        id, tenant_id, user_id, cuisine_id, name, description,
+                        preparation_steps, cooking_time, sharing_status,
+                        ingredient_ids, is_active, deleted_at, created_at,
+                        updated_at
+                    )
+                    SELECT
+                        id, %(tenant)s, %(user)s, cuisine_id, name, description,
+                        preparation_steps, cooking_time, sharing_status,
+                        ingredient_ids, is_active,
+                        CASE WHEN is_active THEN NULL ELSE now() END, now(), now()
+                    FROM import_recipe
+                    ON CONFLICT (tenant_id, name) DO NOTHING
+                    RETURNING id
+                ), lines AS (
+                    INSERT INTO {RecipeIngredient._meta.db_table} (
+                        id, tenant_id, recipe_id, ingredient_id, quantity, unit,
+                        is_active, created_at, updated_at
+                    )
+                    SELECT
+                        gen_random_uuid(), %(tenant)s, staged.recipe_id,
+                        staged.ingredient_id, staged.quantity, staged.unit,
+                        true, now(), now()
+                    FROM import_recipe_ingredient staged
+                    JOIN inserted ON inserted.id = staged.recipe_id
+                )
+                SELECT id FROM inserted
+                """,
+                {"tenant": self.tenant.id, "user": self.user.id},
+            )
+            inserted = {recipe_id for (recipe_id,) in cursor.fetchall()}
+
+        recipes_activated(
+            self.tenant.id,
+            [
+                (
+                    cuisines.get(row["cuisine"]),
+                    [ingredients[name] for name in row["lines"]],
+                )
+                for row in live
+                if row["id"] in inserted
+            ],
+        )
+
+        self.imported += len(inserted)
+        self.duplicates += len(batch) - len(inserted)
@@ -0,0 +1,28 @@
+from django.core.management.base import BaseCommand
+from common.cache import get_stats
+from common.constants import (
+    CUISINES_CACHE_NAMESPACE,
+    INGREDIENTS_CACHE_NAMESPACE,
+    RECIPES_CACHE_NAMESPACE,
+)
+
+
+class Command(BaseCommand):
+    help = "Show response cache hit/miss counters"
+
+    def handle(self, *args, **options):
+        stats = get_stats(
+            [
+                CUISINES_CACHE_NAMESPACE,
+                INGREDIENTS_CACHE_NAMESPACE,
+                RECIPES_CACHE_NAMESPACE,
+            ]
+        )
+
+        for namespace, counters in stats.items():
+            total = counters["hits"] + counters["misses"]
+            ratio = counters["hits"] / total if total else 0
+            self.stdout.write(
+                f"{namespace}: {counters['hits']} hits, "
+                f"{counters['misses']} misses ({ratio:.1%} hit ratio)"
+            )
@@ -0,0 +1,22 @@
+from users.enums import UserRole
+
+
+class AdminSerializerMixin:
+    """
+    Viewset mixin serializing with `admin_serializer_class` for tenant
+    admins and `serializer_class` for everyone else.
+
+    The helper takes the request explicitly like the rest of these
+    viewsets' methods. It is deliberately not named get_serializer: DRF's
+    metadata and browsable API call that with GenericAPIView's signature.
+    """
+
+    serializer_class = None
+    admin_serializer_class = None
+
+    def get_role_serializer(self, request, *args, **kwargs):
+        if request.user.role == UserRole.ADMIN:
+            serializer_class = self.admin_serializer_class
+        else:
+            serializer_class = self.serializer_class
+        return serializer_class(*args, context={"request": request}, **kwargs)
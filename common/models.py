@@ -1,4 +1,32 @@
 from django.db import models
+from django.utils import timezone
+
+
+class SoftDeleteQuerySet(models.QuerySet):
+    def active(self):
+        return self.filter(is_active=True)
+
+    def deleted(self):
+        return self.filter(is_active=False)
+
+    # Both touch updated_at, which the detail ETags are built from.
+    def soft_delete(self):
+        now = timezone.now()
+        return self.update(is_active=False, deleted_at=now, updated_at=now)
+
+    def restore(self):
+        return self.update(is_active=True, deleted_at=None, updated_at=timezone.now())
+
+
+class SoftDeleteManager(models.Manager.from_queryset(SoftDeleteQuerySet)):
+    pass
+
+
+class ActiveManager(SoftDeleteManager):
+    """Only the rows that are not soft-deleted."""
+
+    def get_queryset(self):
+        return super().get_queryset().active()
 
 
 class BaseModel(models.Model):
@@ -6,5 +34,11 @@ class BaseModel(models.Model):
     updated_at = models.DateTimeField(auto_now=True)
     deleted_at = models.DateTimeField(null=True, blank=True)
 
+    # `objects` stays the default manager and still sees soft-deleted rows,
+    # which the admin listings and reactivation paths rely on. Reads that
+    # must skip soft-deleted rows go through `active_objects`.
+    objects = SoftDeleteManager()
+    active_objects = ActiveManager()
+
     class Meta:
         abstract = True
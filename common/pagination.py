@@ -1,8 +1,19 @@
-from rest_framework.pagination import PageNumberPagination
+import json
+from base64 import urlsafe_b64decode, urlsafe_b64encode
+from django.core.paginator import InvalidPage
+from django.db.models import Q
+from rest_framework.exceptions import NotFound, ValidationError
+from rest_framework.pagination import BasePagination, PageNumberPagination
+from rest_framework.response import Response
+from rest_framework.utils.urls import replace_query_param
 from .constants import (
     DEFAULT_PAGE_SIZE,
     DEFAULT_MAX_PAGE_SIZE,
     DEFAULT_PAGE_SIZE_QUERY_PARAM,
+    PAGINATION_QUERY_PARAM,
+    CURSOR_PAGINATION,
+    CURSOR_QUERY_PARAM,
+    ORDERING_QUERY_PARAM,
 )
 
 
@@ -10,3 +21,192 @@ class DefaultPagination(PageNumberPagination):
     page_size = DEFAULT_PAGE_SIZE
     page_size_query_param = DEFAULT_PAGE_SIZE_QUERY_PARAM
     max_page_size = DEFAULT_MAX_PAGE_SIZE
+
+    async def apaginate_queryset(self, queryset, request, view=None):
+        """
+        Async counterpart of paginate_queryset. The count and the page rows
+        are fetched with the async ORM; the Django paginator only does the
+        page arithmetic, so get_paginated_response works unchanged.
+        """
+        self.request = request
+        paginator = self.django_paginator_class(queryset, self.get_page_size(request))
+        paginator.count = await queryset.acount()
+
+        page_number = self.get_page_number(request, paginator)
+        try:
+            self.page = paginator.page(page_number)
+        except InvalidPage as exc:
+            raise NotFound(
+                self.invalid_page_message.format(
+                    page_number=page_number, message=str(exc)
+                )
+            )
+
+        self.page.object_list = [row async for row in self.page.object_list]
+        return list(self.page)
+
+
+class KeysetPagination(BasePagination):
+    """
+    Keyset pagination over a fixed, unique ordering such as
+    ("-created_at", "-id"). Pages are fetched with a seek predicate on the
+    last seen row instead of OFFSET, and no total count is computed, so
+    every page costs the same regardless of depth.
+    """
+
+    page_size = DEFAULT_PAGE_SIZE
+    page_size_query_param = DEFAULT_PAGE_SIZE_QUERY_PARAM
+    max_page_size = DEFAULT_MAX_PAGE_SIZE
+    cursor_query_param = CURSOR_QUERY_PARAM
+    ordering = ("-created_at", "-id")
+    invalid_cursor_message = "Invalid cursor"
+
+    def __init__(self, ordering=None):
+        if ordering is not None:
+            self.ordering = tuple(ordering)
+
+    def paginate_queryset(self, queryset, request, view=None):
+        queryset = self.get_page_queryset(queryset, request)
+        return self.set_page(list(queryset))
+
+    async def apaginate_queryset(self, queryset, request, view=None):
+        queryset = self.get_page_queryset(queryset, request)
+        return self.set_page([row async for row in queryset])
+
+    def get_page_queryset(self, queryset, request):
+        self.request = request
+        self.base_url = request.build_absolute_uri()
+        self.page_size = self.get_page_size(request)
+        self.fields = [
+            queryset.model._meta.get_field(name.lstrip("-")) for name in self.ordering
+        ]
+
+        self.reverse, self.values = self.decode_cursor(request)
+        ordering = self.ordering
+        if self.reverse:
+            ordering = tuple(self._invert(name) for name in ordering)
+
+        queryset = queryset.order_by(*ordering)
+        if self.values is not None:
+            queryset = queryset.filter(self._seek(ordering, self.values))
+
+        return queryset[: self.page_size + 1]
+
+    def set_page(self, rows):
+        has_more = len(rows) > self.page_size
+        rows = rows[: self.page_size]
+
+        if self.reverse:
+            rows.reverse()
+            self.has_next = self.values is not None
+            self.has_previous = has_more
+        else:
+            self.has_next = has_more
+            self.has_previous = self.values is not None
+
+        self.page = rows
+        return rows
+
+    def get_paginated_response(self, data):
+        return Response(
+            {
+                "next": self.get_next_link(),
+                "previous": self.get_previous_link(),
+                "results": data,
+            }
+        )
+
+    def get_page_size(self, request):
+        try:
+            page_size = int(request.query_params[self.page_size_query_param])
+        except (KeyError, ValueError):
+            return self.page_size
+
+        if page_size <= 0:
+            return self.page_size
+        return min(page_size, self.max_page_size)
+
+    def get_next_link(self):
+        if not self.has_next or not self.page:
+            return None
+        return self.encode_cursor(self.page[-1], reverse=False)
+
+    def get_previous_link(self):
+        if not self.has_previous or not self.page:
+            return None
+        return self.encode_cursor(self.page[0], reverse=True)
+
+    def encode_cursor(self, row, reverse):
+        payload = {
+            "r": int(reverse),
+            "v": [field.value_to_string(row) for field in self.fields],
+        }
+        token = urlsafe_b64encode(json.dumps(payload).encode("ascii")).decode("ascii")
+        return replace_query_param(self.base_url, self.cursor_query_param, token)
+
+    def decode_cursor(self, request):
+        token = request.query_params.get(self.cursor_query_param)
+        if not token:
+            return False, None
+
+        try:
+            payload = json.loads(urlsafe_b64decode(token.encode("ascii")))
+            raw_values = payload["v"]
+            if len(raw_values) != len(self.fields):
+                raise ValueError
+            values = [
+                field.to_python(raw) for field, raw in zip(self.fields, raw_values)
+            ]
+            return bool(payload["r"]), values
+        except Exception:
+            raise NotFound(self.invalid_cursor_message)
+
+    def _seek(self, ordering, values):
+        """
+        Build the lexicographic "comes after" predicate for `values` under
+        `ordering`, e.g. created_at < c OR (created_at = c AND id < i).
+        """
+        condition = Q()
+        for index, name in enumerate(ordering):
+            field = name.lstrip("-")
+            lookup = "lt" if name.startswith("-") else "gt"
+            branch = Q(**{f"{field}__{lookup}": values[index]})
+            for previous, value in zip(ordering[:index], values[:index]):
+                branch &= Q(**{previous.lstrip("-"): value})
+            condition |= branch
+        return condition
+
+    @staticmethod
+    def _invert(name):
+        return name[1:] if name.startswith("-") else f"-{name}"
+
+
+def uses_cursor(request):
+    return (
+        request.query_params.get(PAGINATION_QUERY_PARAM) == CURSOR_PAGINATION
+        or CURSOR_QUERY_PARAM in request.query_params
+    )
+
+
+def get_paginator(request, ordering):
+    """
+    Return the paginator requested by the client. Page number pagination is
+    the default; `?pagination=cursor` (or any `cursor` param) opts into
+    keyset pagination over `ordering`.
+    """
+    if uses_cursor(request):
+        return KeysetPagination(ordering)
+    return DefaultPagination()
+
+
+def get_ordering(request, orderings):
+    """
+    Return the ordering named by `?ordering=` from `orderings`, a mapping of
+    names to order_by() tuples whose first entry is the default.
+    """
+    name = request.query_params.get(ORDERING_QUERY_PARAM, next(iter(orderings)))
+    if name not in orderings:
+        raise ValidationError(
+            {ORDERING_QUERY_PARAM: f"Must be one of: {', '.join(orderings)}."}
+        )
+    return orderings[name]
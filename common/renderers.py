@@ -0,0 +1,23 @@
+from rest_framework.renderers import BaseRenderer
+
+
+class StreamingRenderer(BaseRenderer):
+    """
+    Content negotiation target for views that stream their own body. It
+    lets ?format= select the export format; the view builds the response.
+    """
+
+    charset = "utf-8"
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        raise NotImplementedError("Streaming views build their own response.")
+
+
+class NDJSONRenderer(StreamingRenderer):
+    media_type = "application/x-ndjson"
+    format = "ndjson"
+
+
+class CSVRenderer(StreamingRenderer):
+    media_type = "text/csv"
+    format = "csv"
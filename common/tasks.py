@@ -0,0 +1,11 @@
+from datetime import timedelta
+from celery import shared_task
+from django.utils import timezone
+from .archive import archive_soft_deleted
+from .constants import ARCHIVE_AFTER_DAYS, ARCHIVE_BATCH_SIZE
+
+
+@shared_task
+def archive_soft_deleted_rows():
+    cutoff = timezone.now() - timedelta(days=ARCHIVE_AFTER_DAYS)
+    return archive_soft_deleted(cutoff, ARCHIVE_BATCH_SIZE)
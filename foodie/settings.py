@@ -11,10 +11,15 @@ https://docs.djangoproject.com/en/6.0/ref/settings/
 """
 
 import os
+import sys
 from pathlib import Path
 from dotenv import load_dotenv
 from celery.schedules import crontab
-from common.constants import ACCESS_TOKEN_LIFETIME, REFRESH_TOKEN_LIFETIME
+from common.constants import (
+    ACCESS_TOKEN_LIFETIME,
+    REFRESH_TOKEN_LIFETIME,
+    REPLICA_ALIAS_PREFIX,
+)
 
 
 load_dotenv()
@@ -46,6 +51,7 @@ INSTALLED_APPS = [
     "django.contrib.sessions",
     "django.contrib.messages",
     "django.contrib.staticfiles",
+    "django.contrib.postgres",
     "rest_framework",
     "users",
     "rest_framework_simplejwt.token_blacklist",
@@ -95,9 +101,59 @@ DATABASES = {
         "PASSWORD": os.getenv("DB_PASSWORD"),
         "HOST": os.getenv("DB_HOST"),
         "PORT": os.getenv("DB_PORT"),
+        "OPTIONS": {},
     }
 }
 
+# Connection reuse. Each process keeps a psycopg pool per database, sized
+# by role: web processes serve concurrent requests, Celery prefork workers
+# run one task at a time. Without a pool, connections persist instead.
+PROCESS_ROLE = os.getenv(
+    "PROCESS_ROLE", "worker" if Path(sys.argv[0]).name == "celery" else "web"
+)
+DB_POOL = os.getenv("DB_POOL", "True").lower() == "true"
+
+# With a pool, Django turns health checks into the pool's check callback.
+DATABASES["default"]["CONN_HEALTH_CHECKS"] = True
+
+if DB_POOL:
+    role = PROCESS_ROLE.upper()
+    DATABASES["default"]["OPTIONS"]["pool"] = {
+        "min_size": int(os.getenv(f"DB_POOL_{role}_MIN_SIZE", 1)),
+        "max_size": int(
+            os.getenv(f"DB_POOL_{role}_MAX_SIZE", 10 if role == "WEB" else 2)
+        ),
+        # Seconds to wait for a free connection before failing the request.
+        "timeout": int(os.getenv("DB_POOL_TIMEOUT", 10)),
+        "max_idle": 300,
+        "max_lifetime": 1800,
+    }
+else:
+    DATABASES["default"]["CONN_MAX_AGE"] = int(os.getenv("DB_CONN_MAX_AGE", 60))
+
+# Behind PgBouncer in transaction mode, consecutive statements may run on
+# different server connections, so neither prepared statements nor
+# server-side cursors survive.
+if os.getenv("DB_PGBOUNCER", "False").lower() == "true":
+    DATABASES["default"]["OPTIONS"]["prepare_threshold"] = None
+    DATABASES["default"]["DISABLE_SERVER_SIDE_CURSORS"] = True
+
+# Read replicas, as comma-separated host[:port] entries. Safe requests on
+# the API viewsets read from them; see common.db_router.
+for index, replica in enumerate(
+    host for host in os.getenv("DB_REPLICA_HOSTS", "").split(",") if host.strip()
+):
+    replica_host, _, replica_port = replica.strip().partition(":")
+    DATABASES[f"{REPLICA_ALIAS_PREFIX}{index}"] = {
+        **DATABASES["default"],
+        "HOST": replica_host,
+        "PORT": replica_port or DATABASES["default"]["PORT"],
+        "OPTIONS": {**DATABASES["default"]["OPTIONS"], "connect_timeout": 2},
+        "TEST": {"MIRROR": "default"},
+    }
+
+DATABASE_ROUTERS = ["common.db_router.PrimaryReplicaRouter"]
+
 # Password validation
 # https://docs.djangoproject.com/en/6.0/ref/settings/#auth-password-validators
 
@@ -163,6 +219,18 @@ CELERY_BEAT_SCHEDULE = {
         "task": "users.tasks.cleanup_soft_deleted_users",
         "schedule": crontab(hour=3, minute=0),
     },
+    "archive-soft-deleted-rows": {
+        "task": "common.tasks.archive_soft_deleted_rows",
+        "schedule": crontab(hour=3, minute=30),
+    },
+    "refresh-recipe-stats": {
+        "task": "recipes.tasks.refresh_recipe_stats",
+        "schedule": crontab(minute="*/15"),
+    },
+    "reconcile-tenant-counts": {
+        "task": "tenants.tasks.reconcile_tenant_counts",
+        "schedule": crontab(hour=4, minute=0),
+    },
 }
 
 EMAIL_BACKEND = "django.core.mail.backends.smtp.EmailBackend"
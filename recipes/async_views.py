@@ -0,0 +1,59 @@
+from asgiref.sync import sync_to_async
+from django.shortcuts import aget_object_or_404
+from rest_framework.permissions import IsAuthenticated
+from .permissions import CanViewRecipe
+from .views import CuisineViewSet, IngredientViewSet, RecipeViewSet
+from common.async_views import AsyncReadView
+from common.pagination import get_paginator
+
+
+class AsyncCatalogView(AsyncReadView):
+    async def list(self, request):
+        ordering = self.viewset.get_ordering(request)
+        items = self.viewset.get_queryset(request).order_by(*ordering)
+
+        paginator = get_paginator(request, ordering)
+        page = await paginator.apaginate_queryset(items, request)
+
+        serializer = self.viewset.get_role_serializer(request, page, many=True)
+        return paginator.get_paginated_response(serializer.data).data
+
+    async def retrieve(self, request, pk):
+        item = await aget_object_or_404(self.viewset.get_queryset(request), pk=pk)
+        return self.viewset.get_role_serializer(request, item).data
+
+
+class AsyncCuisineView(AsyncCatalogView):
+    viewset_class = CuisineViewSet
+
+
+class AsyncIngredientView(AsyncCatalogView):
+    viewset_class = IngredientViewSet
+
+
+class AsyncRecipeView(AsyncReadView):
+    viewset_class = RecipeViewSet
+    permission_classes = [IsAuthenticated, CanViewRecipe]
+
+    async def list(self, request):
+        recipes = self.viewset.get_list_queryset(request)
+
+        paginator = get_paginator(request, self.viewset.cursor_ordering)
+        page = await paginator.apaginate_queryset(recipes, request)
+
+        context = await sync_to_async(self.viewset.get_list_serializer_context)(request)
+        serializer = self.viewset.list_serializer_class(
+            page, many=True, context=context
+        )
+        return paginator.get_paginated_response(serializer.data).data
+
+    async def retrieve(self, request, pk):
+        recipe = await aget_object_or_404(
+            self.viewset.get_detail_queryset(request), pk=pk
+        )
+
+        self.check_object_permissions(request, recipe)
+        serializer = self.viewset.retrieve_serializer_class(
+            recipe, context={"request": request}
+        )
+        return serializer.data
@@ -0,0 +1,74 @@
+import threading
+from collections import OrderedDict
+from .models import Cuisine, Ingredient
+from common.cache import get_version
+from common.constants import (
+    CATALOG_CACHE_MAX_TENANTS,
+    CUISINES_CACHE_NAMESPACE,
+    INGREDIENTS_CACHE_NAMESPACE,
+)
+from common.db_router import PRIMARY
+
+
+class Catalog:
+    """
+    One tenant's rows of a catalog model, soft-deleted ones included so
+    existing recipes can still render them. The rows are shared between
+    requests and must be treated as read-only.
+    """
+
+    def __init__(self, rows):
+        self.by_id = {row.id: row for row in rows}
+        self.by_name = {row.name: row for row in rows}
+
+    def get_active(self, pk):
+        row = self.by_id.get(pk)
+        if row is None or not row.is_active:
+            return None
+        return row
+
+
+class CatalogCache:
+    """
+    Per-process LRU of per-tenant catalogs. Each entry is stamped with the
+    tenant's response cache version for `namespace`, which the catalog
+    viewsets bump on every write, so other processes reload on next use.
+    """
+
+    def __init__(self, model, namespace, max_tenants=CATALOG_CACHE_MAX_TENANTS):
+        self.model = model
+        self.namespace = namespace
+        self.max_tenants = max_tenants
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, tenant_id):
+        version = get_version(self.namespace, tenant_id)
+
+        with self._lock:
+            entry = self._entries.get(tenant_id)
+            if entry is not None and entry[0] == version:
+                self._entries.move_to_end(tenant_id)
+                return entry[1]
+
+        # Read from the primary: a lagging replica could otherwise pin
+        # pre-write rows under the post-write version.
+        catalog = Catalog(
+            list(self.model.objects.using(PRIMARY).filter(tenant_id=tenant_id))
+        )
+
+        with self._lock:
+            self._entries[tenant_id] = (version, catalog)
+            self._entries.move_to_end(tenant_id)
+            while len(self._entries) > self.max_tenants:
+                self._entries.popitem(last=False)
+
+        return catalog
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+cuisine_catalog = CatalogCache(Cuisine, CUISINES_CACHE_NAMESPACE)
+ingredient_catalog = CatalogCache(Ingredient, INGREDIENTS_CACHE_NAMESPACE)
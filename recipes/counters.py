@@ -0,0 +1,86 @@
+from collections import Counter, defaultdict
+from django.db import transaction
+from django.db.models import F
+from common.cache import bump_version
+from common.constants import RECIPE_USAGE_CACHE_NAMESPACE
+from tenants.counters import adjust_counts
+from .models import Cuisine, Ingredient
+
+
+def usage(recipes):
+    """
+    Count how many of `recipes`, given as (cuisine_id, ingredient_ids)
+    pairs, use each cuisine and each ingredient.
+    """
+    cuisines = Counter()
+    ingredients = Counter()
+    for cuisine_id, ingredient_ids in recipes:
+        if cuisine_id is not None:
+            cuisines[cuisine_id] += 1
+        ingredients.update(set(ingredient_ids))
+    return cuisines, ingredients
+
+
+def apply_usage(tenant_id, cuisines, ingredients):
+    """
+    Add the given per-row amounts to active_recipe_count with F() updates,
+    one UPDATE per model and distinct amount. Call it inside the
+    transaction that changes the recipes; the tenant's cached counts are
+    invalidated once it commits.
+
+    The rows are locked up front in primary key order, cuisines before
+    ingredients, so concurrent writers sharing rows queue instead of
+    deadlocking on each other's partial updates.
+    """
+    changed = False
+    for model, counts in ((Cuisine, cuisines), (Ingredient, ingredients)):
+        by_amount = defaultdict(list)
+        for pk, amount in counts.items():
+            if amount:
+                by_amount[amount].append(pk)
+        if not by_amount:
+            continue
+        changed = True
+
+        locked = model.objects.select_for_update().filter(
+            pk__in=[pk for pks in by_amount.values() for pk in pks]
+        )
+        list(locked.order_by("pk").values_list("pk", flat=True))
+
+        for amount, pks in by_amount.items():
+            model.objects.filter(pk__in=pks).update(
+                active_recipe_count=F("active_recipe_count") + amount
+            )
+
+    if changed:
+        transaction.on_commit(
+            lambda: bump_version(tenant_id, RECIPE_USAGE_CACHE_NAMESPACE)
+        )
+
+
+def recipes_activated(tenant_id, recipes):
+    """Count `recipes` of one tenant that were created or restored."""
+    recipes = list(recipes)
+    apply_usage(tenant_id, *usage(recipes))
+    adjust_counts(tenant_id, active_recipe_count=len(recipes))
+
+
+def recipes_deactivated(tenant_id, recipes):
+    """Uncount `recipes` of one tenant that were soft-deleted."""
+    recipes = list(recipes)
+    cuisines, ingredients = usage(recipes)
+    apply_usage(
+        tenant_id,
+        {pk: -amount for pk, amount in cuisines.items()},
+        {pk: -amount for pk, amount in ingredients.items()},
+    )
+    adjust_counts(tenant_id, active_recipe_count=-len(recipes))
+
+
+def recipe_changed(tenant_id, before, after):
+    """Move an active recipe of one tenant's usage from `before` to `after`."""
+    cuisines, ingredients = usage([after])
+    old_cuisines, old_ingredients = usage([before])
+    cuisines.subtract(old_cuisines)
+    ingredients.subtract(old_ingredients)
+    apply_usage(tenant_id, cuisines, ingredients)
@@ -4,3 +4,8 @@ from django.db import models
 class SharingStatus(models.TextChoices):
     PUBLIC = "PUBLIC", "Public"
     PRIVATE = "PRIVATE", "Private"
+
+
+class IngredientMatch(models.TextChoices):
+    ANY = "any", "Any"
+    ALL = "all", "All"
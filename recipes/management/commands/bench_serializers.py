@@ -0,0 +1,154 @@
+import time
+import uuid
+from decimal import Decimal
+from types import SimpleNamespace
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+from rest_framework import serializers
+from rest_framework.renderers import JSONRenderer
+from recipes.enums import SharingStatus
+from recipes.models import Cuisine, Ingredient, Recipe, RecipeIngredient
+from recipes.serializers import (
+    CuisineSerializer,
+    AdminCuisineSerializer,
+    RecipeSerializer,
+    AdminRecipeSerializer,
+    RecipeListSerializer,
+    AdminRecipeListSerializer,
+    FastRecipeSerializer,
+    FastRecipeListSerializer,
+)
+from users.enums import UserRole
+from users.models import User
+
+
+def build_recipes(count, ingredients_per_recipe):
+    """
+    Unsaved recipes with their relations pre-populated the way the views'
+    select_related/prefetch_related leave them, so no database is needed.
+    """
+    now = timezone.now()
+    cuisine = Cuisine(id=uuid.uuid4(), name="Italian", created_at=now, updated_at=now)
+    ingredients = [
+        Ingredient(
+            id=uuid.uuid4(), name=f"Ingredient {i}", created_at=now, updated_at=now
+        )
+        for i in range(ingredients_per_recipe)
+    ]
+
+    recipes = []
+    for i in range(count):
+        recipe = Recipe(
+            id=uuid.uuid4(),
+            user=User(id=uuid.uuid4()),
+            cuisine=cuisine,
+            name=f"Recipe {i}",
+            description="A short description of the dish.",
+            preparation_steps="Chop, stir, simmer and serve. " * 20,
+            cooking_time=30 + i % 60,
+            sharing_status=SharingStatus.PUBLIC,
+            created_at=now,
+            updated_at=now,
+        )
+        lines = [
+            RecipeIngredient(
+                id=uuid.uuid4(),
+                recipe=recipe,
+                ingredient=ingredient,
+                quantity=Decimal("1.50"),
+                unit="g",
+            )
+            for ingredient in ingredients
+        ]
+        recipe._prefetched_objects_cache = {
+            "ingredients": ingredients,
+            "recipe_ingredients": lines,
+        }
+        recipes.append(recipe)
+    return recipes
+
+
+class MutatingCuisineSerializer(CuisineSerializer):
+    """The old pattern: add admin fields to self.fields on every instance."""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+
+        request = self.context.get("request")
+        if request:
+            if request.user.role == UserRole.ADMIN:
+                self.fields["is_active"] = serializers.BooleanField(read_only=True)
+                self.fields["deleted_at"] = serializers.DateTimeField(read_only=True)
+
+
+class Command(BaseCommand):
+    help = "Compare DRF and fast recipe read serializers on in-memory rows"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--rows", type=int, default=10000)
+        parser.add_argument("--ingredients", type=int, default=8)
+        parser.add_argument("--admin", action="store_true")
+
+    def handle(self, *args, **options):
+        recipes = build_recipes(options["rows"], options["ingredients"])
+        role = UserRole.ADMIN if options["admin"] else UserRole.USER
+        context = {"request": SimpleNamespace(user=SimpleNamespace(role=role))}
+        renderer = JSONRenderer()
+
+        if options["admin"]:
+            pairs = [
+                ("list", AdminRecipeListSerializer, FastRecipeListSerializer),
+                ("detail", AdminRecipeSerializer, FastRecipeSerializer),
+            ]
+        else:
+            pairs = [
+                ("list", RecipeListSerializer, FastRecipeListSerializer),
+                ("detail", RecipeSerializer, FastRecipeSerializer),
+            ]
+
+        for label, drf_class, fast_class in pairs:
+            drf_json, drf_time = self.run(drf_class, recipes, context, renderer)
+            fast_json, fast_time = self.run(fast_class, recipes, context, renderer)
+
+            if drf_json != fast_json:
+                raise CommandError(f"{label}: fast serializer output differs")
+
+            self.stdout.write(
+                f"{label}: drf {drf_time * 1000:.0f} ms, "
+                f"fast {fast_time * 1000:.0f} ms "
+                f"({drf_time / fast_time:.1f}x) over {len(recipes)} rows"
+            )
+
+        self.bench_construction(recipes[0].cuisine, context, options["rows"])
+
+    def bench_construction(self, cuisine, context, rounds):
+        """
+        Time building a serializer and its field map per request, with the
+        old per-instance field mutation against a role-specific class.
+        """
+        admin = context["request"].user.role == UserRole.ADMIN
+        role_class = AdminCuisineSerializer if admin else CuisineSerializer
+
+        timings = {}
+        for label, serializer_class in [
+            ("mutating", MutatingCuisineSerializer),
+            ("role class", role_class),
+        ]:
+            start = time.perf_counter()
+            for _ in range(rounds):
+                serializer_class(cuisine, context=context).data
+            timings[label] = time.perf_counter() - start
+
+        self.stdout.write(
+            "construction: "
+            + ", ".join(
+                f"{label} {elapsed * 1000:.0f} ms" for label, elapsed in timings.items()
+            )
+            + f" over {rounds} serializers"
+        )
+
+    def run(self, serializer_class, recipes, context, renderer):
+        start = time.perf_counter()
+        data = serializer_class(recipes, many=True, context=context).data
+        output = renderer.render(data)
+        return output, time.perf_counter() - start
@@ -0,0 +1,81 @@
+import json
+import statistics
+import time
+import uuid
+from django.core.management.base import BaseCommand, CommandError
+from django.db.models import Count
+from recipes.models import Recipe, RecipeIngredient
+
+
+def relations(plan):
+    """Names of every table scanned by an EXPLAIN (FORMAT JSON) plan node."""
+    names = set()
+    if "Relation Name" in plan:
+        names.add(plan["Relation Name"])
+    for child in plan.get("Plans", []):
+        names |= relations(child)
+    return names
+
+
+class Command(BaseCommand):
+    help = (
+        "Measure per-tenant recipe query latency. Run it before and after "
+        "partition_recipe_tables to compare how small tenants fare next to "
+        "large ones."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--tenant",
+            action="append",
+            default=[],
+            help="Tenant id to measure; repeatable. Default: the largest tenants.",
+        )
+        parser.add_argument("--top", type=int, default=10)
+        parser.add_argument("--runs", type=int, default=50)
+
+    def handle(self, *args, **options):
+        if options["runs"] < 2:
+            raise CommandError("--runs must be at least 2")
+
+        sizes = dict(
+            Recipe.objects.order_by()
+            .values("tenant_id")
+            .annotate(recipes=Count("id"))
+            .values_list("tenant_id", "recipes")
+        )
+        try:
+            tenants = [uuid.UUID(tenant_id) for tenant_id in options["tenant"]]
+        except ValueError:
+            raise CommandError("--tenant must be a tenant id")
+        if not tenants:
+            tenants = sorted(sizes, key=sizes.get, reverse=True)[: options["top"]]
+
+        for tenant_id in tenants:
+            recipes = Recipe.objects.filter(tenant_id=tenant_id, is_active=True)
+            latest = recipes.order_by("-created_at", "-id").values_list("id", flat=True)
+            queries = {
+                "list": lambda: list(latest[:20]),
+                "count": recipes.count,
+                "lines": RecipeIngredient.objects.filter(tenant_id=tenant_id).count,
+            }
+
+            plan = json.loads(recipes.order_by().explain(format="json"))[0]["Plan"]
+            self.stdout.write(
+                f"Tenant {tenant_id}: {sizes.get(tenant_id, 0)} recipes, "
+                f"count scans {len(relations(plan))} relation(s)"
+            )
+
+            for label, query in queries.items():
+                query()
+                timings = []
+                for _ in range(options["runs"]):
+                    started = time.perf_counter()
+                    query()
+                    timings.append(time.perf_counter() - started)
+
+                percentiles = statistics.quantiles(timings, n=100)
+                self.stdout.write(
+                    f"  {label:>5}: p50 {percentiles[49] * 1000:.2f} ms, "
+                    f"p95 {percentiles[94] * 1000:.2f} ms"
+                )
@@ -0,0 +1,227 @@
+import uuid
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from recipes.models import Recipe, RecipeIngredient
+
+PARTITION_KEY = "tenant_id"
+
+
+class Command(BaseCommand):
+    help = (
+        "Rebuild the recipe and recipe ingredient tables as tables partitioned on "
+        "tenant_id, copying existing rows. Takes exclusive locks on both tables; "
+        "run it in a maintenance window."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--partitions",
+            type=int,
+            default=16,
+            help="Number of hash partitions shared by tenants without their own.",
+        )
+        parser.add_argument(
+            "--tenant",
+            action="append",
+            default=[],
+            help="Give this tenant id a dedicated list partition; repeatable.",
+        )
+        parser.add_argument(
+            "--dry-run",
+            action="store_true",
+            help="Print the SQL instead of running it.",
+        )
+
+    def handle(self, *args, **options):
+        if options["partitions"] < 1:
+            raise CommandError("--partitions must be at least 1")
+
+        try:
+            tenants = list(dict.fromkeys(uuid.UUID(t) for t in options["tenant"]))
+        except ValueError:
+            raise CommandError("--tenant must be a tenant id")
+
+        recipe = Recipe._meta.db_table
+        line = RecipeIngredient._meta.db_table
+
+        with connection.cursor() as cursor:
+            if self.is_partitioned(cursor, recipe):
+                raise CommandError(f"{recipe} is already partitioned")
+            self.check_references(cursor, recipe, line)
+            tables = {table: self.describe(cursor, table) for table in (recipe, line)}
+            views = self.dependent_views(cursor, tables)
+
+        # Materialized views such as the recipe stats would pin the old
+        # tables; drop them first and rebuild them on the new ones.
+        statements = [f"DROP MATERIALIZED VIEW {view}" for view in views]
+        for table in tables:
+            statements.append(f"ALTER TABLE {table} RENAME TO {table}_unpartitioned")
+        for table in tables:
+            statements += self.create_statements(table, options["partitions"], tenants)
+        for table, described in tables.items():
+            columns = ", ".join(
+                connection.ops.quote_name(column) for column in described["columns"]
+            )
+            statements.append(
+                f"INSERT INTO {table} ({columns}) "
+                f"SELECT {columns} FROM {table}_unpartitioned"
+            )
+        # The line table references the recipe table, so it goes first.
+        for table in reversed(tables):
+            statements.append(f"DROP TABLE {table}_unpartitioned")
+        for table, described in tables.items():
+            statements += self.constraint_statements(table, described, recipe)
+            statements += described["indexes"]
+            statements.append(f"ANALYZE {table}")
+        for view, (definition, indexes) in views.items():
+            statements.append(f"CREATE MATERIALIZED VIEW {view} AS {definition}")
+            statements += indexes
+
+        if options["dry_run"]:
+            for statement in statements:
+                self.stdout.write(f"{statement};")
+            return
+
+        with transaction.atomic(), connection.cursor() as cursor:
+            for statement in statements:
+                cursor.execute(statement)
+
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Partitioned {recipe} and {line}: {options['partitions']} hash "
+                f"partitions, {len(tenants)} dedicated tenant partitions"
+            )
+        )
+
+    def is_partitioned(self, cursor, table):
+        cursor.execute(
+            "SELECT EXISTS (SELECT 1 FROM pg_partitioned_table "
+            "WHERE partrelid = %s::regclass)",
+            [table],
+        )
+        return cursor.fetchone()[0]
+
+    def check_references(self, cursor, recipe, line):
+        # Only the composite (tenant_id, recipe_id) key can point at a
+        # partitioned recipe table; any other foreign key would break.
+        cursor.execute(
+            "SELECT conrelid::regclass::text FROM pg_constraint "
+            "WHERE contype = 'f' AND confrelid = %s::regclass "
+            "AND conrelid <> %s::regclass",
+            [recipe, line],
+        )
+        others = [row[0] for row in cursor.fetchall()]
+        if others:
+            raise CommandError(
+                f"{recipe} is referenced by {', '.join(others)}; "
+                "only the recipe ingredient table may reference it"
+            )
+
+    def dependent_views(self, cursor, tables):
+        """Definitions and indexes of materialized views reading `tables`."""
+        cursor.execute(
+            "SELECT DISTINCT v.oid::regclass::text, pg_get_viewdef(v.oid) "
+            "FROM pg_depend d JOIN pg_rewrite r ON r.oid = d.objid "
+            "JOIN pg_class v ON v.oid = r.ev_class "
+            "WHERE d.classid = 'pg_rewrite'::regclass AND v.relkind = 'm' "
+            "AND d.refobjid = ANY(%s::regclass[])",
+            [list(tables)],
+        )
+        views = {}
+        for view, definition in cursor.fetchall():
+            cursor.execute(
+                "SELECT pg_get_indexdef(indexrelid) FROM pg_index "
+                "WHERE indrelid = %s::regclass",
+                [view],
+            )
+            indexes = [row[0] for row in cursor.fetchall()]
+            views[view] = (definition.strip().rstrip(";"), indexes)
+        return views
+
+    def describe(self, cursor, table):
+        """Capture columns, constraints and plain indexes before renaming."""
+        cursor.execute(
+            "SELECT column_name FROM information_schema.columns "
+            "WHERE table_schema = current_schema() AND table_name = %s "
+            "AND is_generated = 'NEVER' ORDER BY ordinal_position",
+            [table],
+        )
+        columns = [row[0] for row in cursor.fetchall()]
+
+        cursor.execute(
+            "SELECT conname, contype, pg_get_constraintdef(oid) FROM pg_constraint "
+            "WHERE conrelid = %s::regclass AND contype IN ('p', 'u', 'f') "
+            "ORDER BY contype DESC, conname",
+            [table],
+        )
+        constraints = cursor.fetchall()
+
+        cursor.execute(
+            "SELECT pg_get_indexdef(i.indexrelid) FROM pg_index i "
+            "WHERE i.indrelid = %s::regclass AND NOT EXISTS ("
+            "SELECT 1 FROM pg_constraint c "
+            "WHERE c.conindid = i.indexrelid AND c.conrelid = i.indrelid)",
+            [table],
+        )
+        indexes = [row[0] for row in cursor.fetchall()]
+
+        return {"columns": columns, "constraints": constraints, "indexes": indexes}
+
+    def create_statements(self, table, partitions, tenants):
+        like = (
+            f"LIKE {table}_unpartitioned INCLUDING DEFAULTS INCLUDING GENERATED "
+            "INCLUDING CONSTRAINTS INCLUDING STORAGE"
+        )
+
+        if tenants:
+            statements = [
+                f"CREATE TABLE {table} ({like}) PARTITION BY LIST ({PARTITION_KEY})"
+            ]
+            statements += [
+                f"CREATE TABLE {table}_t_{tenant_id.hex} PARTITION OF {table} "
+                f"FOR VALUES IN ('{tenant_id}')"
+                for tenant_id in tenants
+            ]
+            statements.append(
+                f"CREATE TABLE {table}_default PARTITION OF {table} DEFAULT "
+                f"PARTITION BY HASH ({PARTITION_KEY})"
+            )
+            parent = f"{table}_default"
+        else:
+            statements = [
+                f"CREATE TABLE {table} ({like}) PARTITION BY HASH ({PARTITION_KEY})"
+            ]
+            parent = table
+
+        statements += [
+            f"CREATE TABLE {table}_p{remainder} PARTITION OF {parent} "
+            f"FOR VALUES WITH (MODULUS {partitions}, REMAINDER {remainder})"
+            for remainder in range(partitions)
+        ]
+        return statements
+
+    def constraint_statements(self, table, described, recipe):
+        statements = []
+
+        for name, kind, definition in described["constraints"]:
+            name = connection.ops.quote_name(name)
+
+            if kind == "p":
+                # Unique keys on a partitioned table must contain the
+                # partition key; ids stay unique by being uuid4.
+                definition = f"PRIMARY KEY ({PARTITION_KEY}, id)"
+            elif kind == "u" and PARTITION_KEY not in definition:
+                raise CommandError(
+                    f"Unique constraint {name} on {table} does not include "
+                    f"{PARTITION_KEY} and cannot be kept on a partitioned table"
+                )
+            elif kind == "f" and definition.startswith("FOREIGN KEY (recipe_id)"):
+                definition = (
+                    f"FOREIGN KEY ({PARTITION_KEY}, recipe_id) "
+                    f"REFERENCES {recipe} ({PARTITION_KEY}, id) "
+                    "DEFERRABLE INITIALLY DEFERRED"
+                )
+
+            statements.append(f"ALTER TABLE {table} ADD CONSTRAINT {name} {definition}")
+
+        return statements
@@ -0,0 +1,91 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.db.models import Count, F, OuterRef, Subquery, Value
+from django.db.models.functions import Coalesce
+from common.cache import bump_version
+from common.constants import RECIPE_USAGE_CACHE_NAMESPACE
+from recipes.models import Cuisine, Ingredient, Recipe, RecipeIngredient
+
+
+def expected_count(rows, column):
+    return Coalesce(
+        Subquery(
+            rows.filter(**{column: OuterRef("pk")})
+            .order_by()
+            .values(column)
+            .annotate(recipes=Count("*"))
+            .values("recipes")
+        ),
+        Value(0),
+    )
+
+
+def expected_cuisine_count():
+    return expected_count(Recipe.objects.filter(is_active=True), "cuisine_id")
+
+
+def expected_ingredient_count():
+    return expected_count(
+        RecipeIngredient.objects.filter(recipe__is_active=True), "ingredient_id"
+    )
+
+
+class Command(BaseCommand):
+    help = (
+        "Recompute active_recipe_count on cuisines and ingredients, or check "
+        "it for drift"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--check",
+            action="store_true",
+            help="Only report drifted rows; exit with an error if any are found.",
+        )
+
+    def handle(self, *args, **options):
+        check = options["check"]
+
+        scanned = 0
+        drifted = 0
+        tenant_ids = set()
+
+        for model, expected in (
+            (Cuisine, expected_cuisine_count),
+            (Ingredient, expected_ingredient_count),
+        ):
+            rows = model.objects.order_by().annotate(expected=expected())
+            scanned += model.objects.count()
+            stale = rows.exclude(active_recipe_count=F("expected"))
+
+            if check:
+                for pk, current, wanted in stale.values_list(
+                    "id", "active_recipe_count", "expected"
+                ):
+                    drifted += 1
+                    self.stdout.write(
+                        f"Drift: {model._meta.model_name} {pk} counts {current}, "
+                        f"expected {wanted}"
+                    )
+                continue
+
+            with transaction.atomic():
+                rows = list(stale.select_for_update().values_list("id", "tenant_id"))
+                drifted += model.objects.filter(id__in=[pk for pk, _ in rows]).update(
+                    active_recipe_count=expected()
+                )
+                tenant_ids.update(tenant_id for _, tenant_id in rows)
+
+        for tenant_id in tenant_ids:
+            bump_version(tenant_id, RECIPE_USAGE_CACHE_NAMESPACE)
+
+        if check:
+            if drifted:
+                raise CommandError(
+                    f"{drifted} of {scanned} rows have a stale active_recipe_count"
+                )
+            self.stdout.write(self.style.SUCCESS(f"{scanned} rows consistent"))
+        else:
+            self.stdout.write(
+                self.style.SUCCESS(f"Reconciled {drifted} of {scanned} rows")
+            )
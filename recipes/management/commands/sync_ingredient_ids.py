@@ -0,0 +1,82 @@
+from django.contrib.postgres.aggregates import ArrayAgg
+from django.contrib.postgres.fields import ArrayField
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.db.models import OuterRef, Subquery, UUIDField, Value
+from django.db.models.functions import Coalesce
+from recipes.models import Recipe, RecipeIngredient
+
+
+def expected_ingredient_ids():
+    return Coalesce(
+        Subquery(
+            RecipeIngredient.objects.filter(recipe_id=OuterRef("pk"))
+            .values("recipe_id")
+            .annotate(ids=ArrayAgg("ingredient_id"))
+            .values("ids")
+        ),
+        Value([], output_field=ArrayField(UUIDField())),
+    )
+
+
+class Command(BaseCommand):
+    help = (
+        "Backfill Recipe.ingredient_ids from recipe ingredients, or check it for drift"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--check",
+            action="store_true",
+            help="Only report drifted recipes; exit with an error if any are found.",
+        )
+        parser.add_argument("--batch-size", type=int, default=1000)
+
+    def handle(self, *args, **options):
+        check = options["check"]
+        batch_size = options["batch_size"]
+
+        rows = (
+            Recipe.objects.order_by()
+            .annotate(expected_ids=expected_ingredient_ids())
+            .values_list("id", "ingredient_ids", "expected_ids")
+        )
+
+        scanned = 0
+        drifted = 0
+        batch = []
+
+        for recipe_id, current, expected in rows.iterator(chunk_size=batch_size):
+            scanned += 1
+            if set(current) == set(expected):
+                continue
+
+            drifted += 1
+            if check:
+                self.stdout.write(f"Drift: recipe {recipe_id}")
+                continue
+
+            batch.append(recipe_id)
+            if len(batch) >= batch_size:
+                self.sync(batch)
+                batch = []
+
+        if batch:
+            self.sync(batch)
+
+        if check:
+            if drifted:
+                raise CommandError(
+                    f"{drifted} of {scanned} recipes have stale ingredient_ids"
+                )
+            self.stdout.write(self.style.SUCCESS(f"{scanned} recipes consistent"))
+        else:
+            self.stdout.write(
+                self.style.SUCCESS(f"Synced {drifted} of {scanned} recipes")
+            )
+
+    def sync(self, recipe_ids):
+        with transaction.atomic():
+            Recipe.objects.filter(id__in=recipe_ids).update(
+                ingredient_ids=expected_ingredient_ids()
+            )
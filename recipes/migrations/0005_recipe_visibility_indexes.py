@@ -0,0 +1,36 @@
+# Generated by Django 6.0 on 2026-10-17 09:12
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("recipes", "0004_alter_cuisine_tenant_alter_ingredient_tenant_and_more"),
+        ("tenants", "0001_initial"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="recipe",
+            index=models.Index(
+                condition=models.Q(("is_active", True)),
+                fields=["tenant", "sharing_status", "-created_at", "-id"],
+                name="recipe_tenant_shared_idx",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="recipe",
+            index=models.Index(
+                condition=models.Q(("is_active", True)),
+                fields=["user", "-created_at", "-id"],
+                name="recipe_user_active_idx",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="recipe",
+            index=models.Index(
+                fields=["-created_at", "-id"], name="recipe_created_idx"
+            ),
+        ),
+    ]
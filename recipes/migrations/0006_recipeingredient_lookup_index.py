@@ -0,0 +1,19 @@
+# Generated by Django 6.0 on 2026-10-17 10:05
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("recipes", "0005_recipe_visibility_indexes"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="recipeingredient",
+            index=models.Index(
+                fields=["ingredient", "recipe"], name="recipe_ingredient_lookup_idx"
+            ),
+        ),
+    ]
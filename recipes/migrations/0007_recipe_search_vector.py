@@ -0,0 +1,40 @@
+# Generated by Django 6.0 on 2026-10-17 11:20
+
+import django.contrib.postgres.indexes
+import django.contrib.postgres.search
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("recipes", "0006_recipeingredient_lookup_index"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="recipe",
+            name="search_vector",
+            field=models.GeneratedField(
+                db_persist=True,
+                expression=(
+                    django.contrib.postgres.search.SearchVector(
+                        "name", config="english", weight="A"
+                    )
+                    + django.contrib.postgres.search.SearchVector(
+                        "description", config="english", weight="B"
+                    )
+                    + django.contrib.postgres.search.SearchVector(
+                        "preparation_steps", config="english", weight="C"
+                    )
+                ),
+                output_field=django.contrib.postgres.search.SearchVectorField(),
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="recipe",
+            index=django.contrib.postgres.indexes.GinIndex(
+                fields=["search_vector"], name="recipe_search_vector_idx"
+            ),
+        ),
+    ]
@@ -0,0 +1,43 @@
+# Generated by Django 6.0 on 2026-10-17 12:48
+
+import django.contrib.postgres.fields
+import django.contrib.postgres.indexes
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("recipes", "0008_trigram_name_indexes"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="recipe",
+            name="ingredient_ids",
+            field=django.contrib.postgres.fields.ArrayField(
+                base_field=models.UUIDField(), blank=True, default=list, size=None
+            ),
+        ),
+        # Same result as the sync_ingredient_ids command, run before the
+        # index exists so the backfill does not maintain it row by row.
+        migrations.RunSQL(
+            sql="""
+            UPDATE recipes_recipe
+            SET ingredient_ids = lines.ids
+            FROM (
+                SELECT recipe_id, array_agg(ingredient_id) AS ids
+                FROM recipes_recipeingredient
+                GROUP BY recipe_id
+            ) lines
+            WHERE lines.recipe_id = recipes_recipe.id
+            """,
+            reverse_sql=migrations.RunSQL.noop,
+        ),
+        migrations.AddIndex(
+            model_name="recipe",
+            index=django.contrib.postgres.indexes.GinIndex(
+                fields=["ingredient_ids"], name="recipe_ingredient_ids_idx"
+            ),
+        ),
+    ]
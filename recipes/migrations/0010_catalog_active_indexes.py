@@ -0,0 +1,29 @@
+# Generated by Django 6.0 on 2026-10-17 15:02
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("recipes", "0009_recipe_ingredient_ids"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="cuisine",
+            index=models.Index(
+                condition=models.Q(("is_active", True)),
+                fields=["tenant", "name"],
+                name="cuisine_tenant_active_idx",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="ingredient",
+            index=models.Index(
+                condition=models.Q(("is_active", True)),
+                fields=["tenant", "name"],
+                name="ingredient_tenant_active_idx",
+            ),
+        ),
+    ]
@@ -0,0 +1,67 @@
+# Generated by Django 6.0 on 2026-10-17 15:40
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("recipes", "0010_catalog_active_indexes"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="cuisine",
+            name="active_recipe_count",
+            field=models.IntegerField(db_default=0, default=0),
+        ),
+        migrations.AddField(
+            model_name="ingredient",
+            name="active_recipe_count",
+            field=models.IntegerField(db_default=0, default=0),
+        ),
+        migrations.RunSQL(
+            sql=[
+                """
+                UPDATE recipes_cuisine
+                SET active_recipe_count = usage.recipes
+                FROM (
+                    SELECT cuisine_id, count(*) AS recipes
+                    FROM recipes_recipe
+                    WHERE is_active AND cuisine_id IS NOT NULL
+                    GROUP BY cuisine_id
+                ) usage
+                WHERE usage.cuisine_id = recipes_cuisine.id
+                """,
+                """
+                UPDATE recipes_ingredient
+                SET active_recipe_count = usage.recipes
+                FROM (
+                    SELECT line.ingredient_id, count(*) AS recipes
+                    FROM recipes_recipeingredient line
+                    JOIN recipes_recipe recipe ON recipe.id = line.recipe_id
+                    WHERE recipe.is_active
+                    GROUP BY line.ingredient_id
+                ) usage
+                WHERE usage.ingredient_id = recipes_ingredient.id
+                """,
+            ],
+            reverse_sql=migrations.RunSQL.noop,
+        ),
+        migrations.AddIndex(
+            model_name="cuisine",
+            index=models.Index(
+                condition=models.Q(("is_active", True)),
+                fields=["tenant", "-active_recipe_count", "name", "id"],
+                name="cuisine_popular_idx",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="ingredient",
+            index=models.Index(
+                condition=models.Q(("is_active", True)),
+                fields=["tenant", "-active_recipe_count", "name", "id"],
+                name="ingredient_popular_idx",
+            ),
+        ),
+    ]
@@ -0,0 +1,74 @@
+# Generated by Django 6.0 on 2026-10-17 17:05
+
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("recipes", "0011_catalog_active_recipe_count"),
+    ]
+
+    operations = [
+        migrations.RunSQL(
+            sql=[
+                """
+                CREATE MATERIALIZED VIEW recipes_recipe_stats AS
+                WITH active AS (
+                    SELECT
+                        tenant_id, cuisine_id, ingredient_ids, cooking_time,
+                        sharing_status, created_at
+                    FROM recipes_recipe
+                    WHERE is_active
+                )
+                SELECT
+                    tenant_id, 'cuisine'::text AS metric,
+                    COALESCE(cuisine_id::text, '') AS bucket,
+                    count(*) AS recipes
+                FROM active
+                GROUP BY tenant_id, cuisine_id
+                UNION ALL
+                SELECT
+                    tenant_id, 'cooking_time',
+                    width_bucket(cooking_time, ARRAY[15, 30, 60, 120])::text,
+                    count(*)
+                FROM active
+                GROUP BY 1, 3
+                UNION ALL
+                SELECT tenant_id, 'sharing_status', sharing_status, count(*)
+                FROM active
+                GROUP BY tenant_id, sharing_status
+                UNION ALL
+                SELECT tenant_id, 'ingredient', ingredient_id::text, count(*)
+                FROM active, unnest(ingredient_ids) AS ingredient_id
+                GROUP BY tenant_id, ingredient_id
+                UNION ALL
+                SELECT
+                    tenant_id, 'created_on',
+                    (created_at AT TIME ZONE 'UTC')::date::text,
+                    count(*)
+                FROM active
+                GROUP BY 1, 3
+                """,
+                # Required by REFRESH ... CONCURRENTLY; also serves the
+                # per-tenant reads.
+                """
+                CREATE UNIQUE INDEX recipe_stats_tenant_metric_idx
+                ON recipes_recipe_stats (tenant_id, metric, bucket)
+                """,
+                # When the view was last refreshed; one row, kept outside the
+                # view so a refresh only rewrites the buckets that changed.
+                """
+                CREATE TABLE recipes_recipe_stats_refresh (
+                    id boolean PRIMARY KEY DEFAULT true CHECK (id),
+                    refreshed_at timestamp with time zone NOT NULL
+                )
+                """,
+                "INSERT INTO recipes_recipe_stats_refresh (refreshed_at) VALUES (now())",
+            ],
+            reverse_sql=[
+                "DROP TABLE IF EXISTS recipes_recipe_stats_refresh",
+                "DROP MATERIALIZED VIEW IF EXISTS recipes_recipe_stats",
+            ],
+        ),
+    ]
@@ -1,6 +1,10 @@
 import uuid
 from django.db import models
 from django.conf import settings
+from django.contrib.postgres.fields import ArrayField
+from django.contrib.postgres.indexes import GinIndex, OpClass
+from django.db.models.functions import Upper
+from django.contrib.postgres.search import SearchVector, SearchVectorField
 from common.models import BaseModel
 from .enums import SharingStatus
 
@@ -14,6 +18,8 @@ class Cuisine(BaseModel):
     )
     name = models.CharField(max_length=100)
     is_active = models.BooleanField(default=True, db_default=True)
+    # Number of active recipes using this row, maintained by recipes.counters.
+    active_recipe_count = models.IntegerField(default=0, db_default=0)
 
     class Meta:
         ordering = ["name"]
@@ -23,6 +29,25 @@ class Cuisine(BaseModel):
                 name="unique_cuisine_per_tenant",
             )
         ]
+        indexes = [
+            # Serves the UPPER(name) LIKE filters used by autocomplete.
+            GinIndex(
+                OpClass(Upper("name"), name="gin_trgm_ops"),
+                name="cuisine_name_trgm_idx",
+            ),
+            # Serves the non-admin listing, which skips soft-deleted rows.
+            models.Index(
+                fields=["tenant", "name"],
+                condition=models.Q(is_active=True),
+                name="cuisine_tenant_active_idx",
+            ),
+            # Serves ordering the non-admin listing by popularity.
+            models.Index(
+                fields=["tenant", "-active_recipe_count", "name", "id"],
+                condition=models.Q(is_active=True),
+                name="cuisine_popular_idx",
+            ),
+        ]
 
     def __str__(self):
         return self.name
@@ -37,6 +62,8 @@ class Ingredient(BaseModel):
     )
     name = models.CharField(max_length=100)
     is_active = models.BooleanField(default=True, db_default=True)
+    # Number of active recipes using this row, maintained by recipes.counters.
+    active_recipe_count = models.IntegerField(default=0, db_default=0)
 
     class Meta:
         ordering = ["name"]
@@ -46,6 +73,25 @@ class Ingredient(BaseModel):
                 name="unique_ingredient_per_tenant",
             )
         ]
+        indexes = [
+            # Serves the UPPER(name) LIKE filters used by autocomplete.
+            GinIndex(
+                OpClass(Upper("name"), name="gin_trgm_ops"),
+                name="ingredient_name_trgm_idx",
+            ),
+            # Serves the non-admin listing, which skips soft-deleted rows.
+            models.Index(
+                fields=["tenant", "name"],
+                condition=models.Q(is_active=True),
+                name="ingredient_tenant_active_idx",
+            ),
+            # Serves ordering the non-admin listing by popularity.
+            models.Index(
+                fields=["tenant", "-active_recipe_count", "name", "id"],
+                condition=models.Q(is_active=True),
+                name="ingredient_popular_idx",
+            ),
+        ]
 
     def __str__(self):
         return self.name
@@ -82,7 +128,19 @@ class Recipe(BaseModel):
     ingredients = models.ManyToManyField(
         Ingredient, through="RecipeIngredient", related_name="recipes"
     )
+    # Denormalized copy of recipe_ingredients' ingredient ids, kept in sync
+    # by RecipeSerializer, for join-free containment filters.
+    ingredient_ids = ArrayField(models.UUIDField(), default=list, blank=True)
     is_active = models.BooleanField(default=True, db_default=True)
+    search_vector = models.GeneratedField(
+        expression=(
+            SearchVector("name", config="english", weight="A")
+            + SearchVector("description", config="english", weight="B")
+            + SearchVector("preparation_steps", config="english", weight="C")
+        ),
+        output_field=SearchVectorField(),
+        db_persist=True,
+    )
 
     class Meta:
         ordering = ["-created_at"]
@@ -92,6 +150,28 @@ class Recipe(BaseModel):
                 name="unique_recipe_name_per_tenant",
             )
         ]
+        indexes = [
+            # Serves the "public recipes of my tenant" branch of the
+            # visibility query, already in listing order.
+            models.Index(
+                fields=["tenant", "sharing_status", "-created_at", "-id"],
+                condition=models.Q(is_active=True),
+                name="recipe_tenant_shared_idx",
+            ),
+            # Serves the "my own recipes" branch of the visibility query.
+            models.Index(
+                fields=["user", "-created_at", "-id"],
+                condition=models.Q(is_active=True),
+                name="recipe_user_active_idx",
+            ),
+            # Serves the unfiltered admin listing.
+            models.Index(
+                fields=["-created_at", "-id"],
+                name="recipe_created_idx",
+            ),
+            GinIndex(fields=["search_vector"], name="recipe_search_vector_idx"),
+            GinIndex(fields=["ingredient_ids"], name="recipe_ingredient_ids_idx"),
+        ]
 
     def __str__(self):
         return self.name
@@ -125,6 +205,15 @@ class RecipeIngredient(BaseModel):
                 name="unique_ingredient_per_recipe_per_tenant",
             )
         ]
+        indexes = [
+            # Finds the lines using an ingredient, with their recipe ids, for
+            # reconcile_recipe_counts and the archive job's reference check.
+            # The listing filters on Recipe.ingredient_ids instead.
+            models.Index(
+                fields=["ingredient", "recipe"],
+                name="recipe_ingredient_lookup_idx",
+            ),
+        ]
 
     def __str__(self):
         return f"{self.recipe.name} - {self.ingredient.name}"
@@ -1,5 +1,10 @@
+from django.db import transaction
+from django.utils import timezone
+from django.db.models import Prefetch, prefetch_related_objects
 from rest_framework import serializers
 from .models import Cuisine, Ingredient, Recipe, RecipeIngredient
+from .catalog import cuisine_catalog, ingredient_catalog
+from .counters import recipe_changed, recipes_activated
 from users.enums import UserRole
 
 
@@ -9,14 +14,18 @@ class CuisineSerializer(serializers.ModelSerializer):
         fields = ["id", "name", "created_at", "updated_at"]
         read_only_fields = ["id", "created_at", "updated_at"]
 
-    def __init__(self, *args, **kwargs):
-        super().__init__(*args, **kwargs)
 
-        request = self.context.get("request")
-        if request:
-            if request.user.role == UserRole.ADMIN:
-                self.fields["is_active"] = serializers.BooleanField(read_only=True)
-                self.fields["deleted_at"] = serializers.DateTimeField(read_only=True)
+class AdminCuisineSerializer(CuisineSerializer):
+    is_active = serializers.BooleanField(read_only=True)
+    deleted_at = serializers.DateTimeField(read_only=True)
+    active_recipe_count = serializers.IntegerField(read_only=True)
+
+    class Meta(CuisineSerializer.Meta):
+        fields = CuisineSerializer.Meta.fields + [
+            "is_active",
+            "deleted_at",
+            "active_recipe_count",
+        ]
 
 
 class IngredientSerializer(serializers.ModelSerializer):
@@ -25,14 +34,18 @@ class IngredientSerializer(serializers.ModelSerializer):
         fields = ["id", "name", "created_at", "updated_at"]
         read_only_fields = ["id", "created_at", "updated_at"]
 
-    def __init__(self, *args, **kwargs):
-        super().__init__(*args, **kwargs)
 
-        request = self.context.get("request")
-        if request:
-            if request.user.role == UserRole.ADMIN:
-                self.fields["is_active"] = serializers.BooleanField(read_only=True)
-                self.fields["deleted_at"] = serializers.DateTimeField(read_only=True)
+class AdminIngredientSerializer(IngredientSerializer):
+    is_active = serializers.BooleanField(read_only=True)
+    deleted_at = serializers.DateTimeField(read_only=True)
+    active_recipe_count = serializers.IntegerField(read_only=True)
+
+    class Meta(IngredientSerializer.Meta):
+        fields = IngredientSerializer.Meta.fields + [
+            "is_active",
+            "deleted_at",
+            "active_recipe_count",
+        ]
 
 
 class RecipeIngredientSerializer(serializers.ModelSerializer):
@@ -44,16 +57,9 @@ class RecipeIngredientSerializer(serializers.ModelSerializer):
         fields = ["id", "ingredient_id", "ingredient", "quantity", "unit"]
         read_only_fields = ["id"]
 
-    def validate_ingredient_id(self, value):
-        if not Ingredient.objects.filter(id=value, is_active=True).exists():
-            raise serializers.ValidationError(
-                "Ingredient does not exist or is inactive."
-            )
-        return value
-
 
 class RecipeSerializer(serializers.ModelSerializer):
-    user_id = serializers.UUIDField(source="user.id", read_only=True)
+    user_id = serializers.UUIDField(read_only=True)
     cuisine_id = serializers.UUIDField(required=False, allow_null=True, write_only=True)
     cuisine = CuisineSerializer(read_only=True)
     recipe_ingredients = RecipeIngredientSerializer(many=True, required=False)
@@ -79,66 +85,195 @@ class RecipeSerializer(serializers.ModelSerializer):
     def __init__(self, *args, **kwargs):
         super().__init__(*args, **kwargs)
 
-        request = self.context.get("request")
-        if request:
-            if request.user.role == UserRole.ADMIN:
-                self.fields["is_active"] = serializers.BooleanField(read_only=True)
-                self.fields["deleted_at"] = serializers.DateTimeField(read_only=True)
+        # Catalog rows fetched during validation, reused when saving.
+        self._cuisine = None
+        self._ingredients = {}
+
+    def get_tenant_id(self):
+        return self.context["request"].user.tenant_id
 
     def validate_cuisine_id(self, value):
         if value is None:
             return value
 
-        if not Cuisine.objects.filter(id=value, is_active=True).exists():
+        self._cuisine = cuisine_catalog.get(self.get_tenant_id()).get_active(value)
+        if self._cuisine is None:
             raise serializers.ValidationError("Cuisine does not exist or is inactive.")
 
         return value
 
+    def validate_recipe_ingredients(self, value):
+        catalog = ingredient_catalog.get(self.get_tenant_id())
+        ingredients = {}
+        for line in value:
+            ingredient = catalog.get_active(line["ingredient_id"])
+            if ingredient is not None:
+                ingredients[ingredient.id] = ingredient
+
+        errors = []
+        seen = set()
+        for line in value:
+            ingredient_id = line["ingredient_id"]
+            if ingredient_id not in ingredients:
+                errors.append(
+                    {"ingredient_id": ["Ingredient does not exist or is inactive."]}
+                )
+            elif ingredient_id in seen:
+                errors.append(
+                    {"ingredient_id": ["Each ingredient can only be listed once."]}
+                )
+            else:
+                errors.append({})
+            seen.add(ingredient_id)
+
+        if any(errors):
+            raise serializers.ValidationError(errors)
+
+        self._ingredients = ingredients
+        return value
+
+    @transaction.atomic
     def create(self, validated_data):
         recipe_ingredients_data = validated_data.pop("recipe_ingredients", [])
         cuisine_id = validated_data.pop("cuisine_id", None)
 
         if cuisine_id:
-            validated_data["cuisine"] = Cuisine.objects.get(id=cuisine_id)
+            validated_data["cuisine"] = self._cuisine
 
-        recipe = Recipe.objects.create(**validated_data)
+        validated_data["ingredient_ids"] = [
+            ingredient_data["ingredient_id"]
+            for ingredient_data in recipe_ingredients_data
+        ]
 
-        for ingredient_data in recipe_ingredients_data:
-            ingredient_id = ingredient_data.pop("ingredient_id")
-            ingredient = Ingredient.objects.get(id=ingredient_id)
-            RecipeIngredient.objects.create(
-                recipe=recipe, ingredient=ingredient, **ingredient_data
-            )
+        recipe = Recipe.objects.create(**validated_data)
+        self.create_recipe_ingredients(recipe, recipe_ingredients_data)
+        recipes_activated(
+            recipe.tenant_id, [(recipe.cuisine_id, recipe.ingredient_ids)]
+        )
 
         return recipe
 
+    @transaction.atomic
     def update(self, instance, validated_data):
         recipe_ingredients_data = validated_data.pop("recipe_ingredients", None)
         cuisine_id = validated_data.pop("cuisine_id", None)
 
+        # Lock the row and reload it, so the save below starts from the
+        # latest committed columns and the usage it is counted under now.
+        instance.refresh_from_db(from_queryset=Recipe.objects.select_for_update())
+        before = (instance.cuisine_id, instance.ingredient_ids)
+
         if "cuisine_id" in self.initial_data:
             if cuisine_id:
-                instance.cuisine = Cuisine.objects.get(id=cuisine_id)
+                instance.cuisine = self._cuisine
             else:
                 instance.cuisine = None
 
         for attr, value in validated_data.items():
             setattr(instance, attr, value)
 
+        if recipe_ingredients_data is not None:
+            instance.ingredient_ids = [
+                ingredient_data["ingredient_id"]
+                for ingredient_data in recipe_ingredients_data
+            ]
+
         instance.save()
 
         if recipe_ingredients_data is not None:
-            instance.recipe_ingredients.all().delete()
-
-            for ingredient_data in recipe_ingredients_data:
-                ingredient_id = ingredient_data.pop("ingredient_id")
-                ingredient = Ingredient.objects.get(id=ingredient_id)
-                RecipeIngredient.objects.create(
-                    recipe=instance, ingredient=ingredient, **ingredient_data
-                )
+            self.sync_recipe_ingredients(instance, recipe_ingredients_data)
+        else:
+            self.prefetch_recipe_ingredients(instance)
+
+        if instance.is_active:
+            recipe_changed(
+                instance.tenant_id,
+                before,
+                (instance.cuisine_id, instance.ingredient_ids),
+            )
 
         return instance
 
+    def build_recipe_ingredient(self, recipe, ingredient_data):
+        return RecipeIngredient(
+            tenant_id=recipe.tenant_id,
+            recipe=recipe,
+            ingredient=self._ingredients[ingredient_data["ingredient_id"]],
+            quantity=ingredient_data["quantity"],
+            unit=ingredient_data["unit"],
+        )
+
+    def create_recipe_ingredients(self, recipe, recipe_ingredients_data):
+        RecipeIngredient.objects.bulk_create(
+            self.build_recipe_ingredient(recipe, ingredient_data)
+            for ingredient_data in recipe_ingredients_data
+        )
+        self.prefetch_recipe_ingredients(recipe)
+
+    def sync_recipe_ingredients(self, recipe, recipe_ingredients_data):
+        """
+        Bring the recipe's lines in line with `recipe_ingredients_data`,
+        touching only the rows that were added, changed or removed.
+        """
+        existing = {
+            line.ingredient_id: line
+            for line in RecipeIngredient.objects.select_for_update().filter(
+                recipe=recipe
+            )
+        }
+
+        to_create = []
+        to_update = []
+        now = timezone.now()
+
+        for ingredient_data in recipe_ingredients_data:
+            line = existing.pop(ingredient_data["ingredient_id"], None)
+
+            if line is None:
+                to_create.append(self.build_recipe_ingredient(recipe, ingredient_data))
+            elif (
+                line.quantity != ingredient_data["quantity"]
+                or line.unit != ingredient_data["unit"]
+            ):
+                line.quantity = ingredient_data["quantity"]
+                line.unit = ingredient_data["unit"]
+                line.updated_at = now
+                to_update.append(line)
+
+        # Whatever is left in `existing` was dropped from the payload.
+        if existing:
+            RecipeIngredient.objects.filter(
+                id__in=[line.id for line in existing.values()]
+            ).delete()
+        if to_update:
+            RecipeIngredient.objects.bulk_update(
+                to_update, ["quantity", "unit", "updated_at"]
+            )
+        if to_create:
+            RecipeIngredient.objects.bulk_create(to_create)
+
+        self.prefetch_recipe_ingredients(recipe)
+
+    def prefetch_recipe_ingredients(self, recipe):
+        # Load the lines back with their ingredients in one query, so the
+        # response does not fetch each ingredient separately.
+        getattr(recipe, "_prefetched_objects_cache", {}).pop("recipe_ingredients", None)
+        prefetch_related_objects(
+            [recipe],
+            Prefetch(
+                "recipe_ingredients",
+                queryset=RecipeIngredient.objects.select_related("ingredient"),
+            ),
+        )
+
+
+class AdminRecipeSerializer(RecipeSerializer):
+    is_active = serializers.BooleanField(read_only=True)
+    deleted_at = serializers.DateTimeField(read_only=True)
+
+    class Meta(RecipeSerializer.Meta):
+        fields = RecipeSerializer.Meta.fields + ["is_active", "deleted_at"]
+
 
 class MiniIngredientSerializer(serializers.ModelSerializer):
     class Meta:
@@ -149,7 +284,7 @@ class MiniIngredientSerializer(serializers.ModelSerializer):
 
 class RecipeListSerializer(serializers.ModelSerializer):
     cuisine = CuisineSerializer(read_only=True)
-    user_id = serializers.UUIDField(source="user.id", read_only=True)
+    user_id = serializers.UUIDField(read_only=True)
     ingredients = MiniIngredientSerializer(many=True, read_only=True)
 
     class Meta:
@@ -167,11 +302,158 @@ class RecipeListSerializer(serializers.ModelSerializer):
         ]
         read_only_fields = fields
 
-    def __init__(self, *args, **kwargs):
-        super().__init__(*args, **kwargs)
 
+class AdminRecipeListSerializer(RecipeListSerializer):
+    is_active = serializers.BooleanField(read_only=True)
+    deleted_at = serializers.DateTimeField(read_only=True)
+
+    class Meta(RecipeListSerializer.Meta):
+        fields = RecipeListSerializer.Meta.fields + ["is_active", "deleted_at"]
+
+
+class BulkRecipeIngredientSerializer(serializers.Serializer):
+    ingredient_id = serializers.UUIDField()
+    quantity = serializers.DecimalField(max_digits=10, decimal_places=2)
+    unit = serializers.CharField(max_length=50)
+
+
+class BulkRecipeSerializer(serializers.ModelSerializer):
+    """
+    Field-level validation for one item of a bulk create. Cuisine and
+    ingredient references are checked for the whole batch at once by
+    bulk_create_recipes.
+    """
+
+    cuisine_id = serializers.UUIDField(required=False, allow_null=True)
+    recipe_ingredients = BulkRecipeIngredientSerializer(many=True, required=False)
+
+    class Meta:
+        model = Recipe
+        fields = [
+            "cuisine_id",
+            "name",
+            "description",
+            "preparation_steps",
+            "cooking_time",
+            "sharing_status",
+            "recipe_ingredients",
+        ]
+
+
+# Read-only fast path. These produce the same JSON as RecipeListSerializer
+# and RecipeSerializer from plain dicts, skipping per-field dispatch. Field
+# order and formatting must be kept in sync with the classes above.
+
+_datetime = serializers.DateTimeField().to_representation
+_quantity = serializers.DecimalField(max_digits=10, decimal_places=2).to_representation
+
+
+def _catalog_row(obj):
+    return {
+        "id": str(obj.id),
+        "name": obj.name,
+        "created_at": _datetime(obj.created_at),
+        "updated_at": _datetime(obj.updated_at),
+    }
+
+
+def _admin_fields(row, obj):
+    row["is_active"] = obj.is_active
+    row["deleted_at"] = _datetime(obj.deleted_at)
+    return row
+
+
+class FastReadSerializer:
+    """
+    Minimal read-only stand-in for a DRF serializer: takes an instance or
+    an iterable with `many=True` and exposes `.data`.
+    """
+
+    def __init__(self, instance, many=False, context=None):
+        self.instance = instance
+        self.many = many
+        self.context = context or {}
+
+    @property
+    def data(self):
         request = self.context.get("request")
-        if request:
-            if request.user.role == UserRole.ADMIN:
-                self.fields["is_active"] = serializers.BooleanField(read_only=True)
-                self.fields["deleted_at"] = serializers.DateTimeField(read_only=True)
+        is_admin = bool(request and request.user.role == UserRole.ADMIN)
+
+        if self.many:
+            return [self.to_representation(obj, is_admin) for obj in self.instance]
+        return self.to_representation(self.instance, is_admin)
+
+    def to_representation(self, obj, is_admin):
+        raise NotImplementedError
+
+
+class FastRecipeListSerializer(FastReadSerializer):
+    """
+    With tenant catalogs under "cuisines" and "ingredients" in the context,
+    related rows are looked up by cuisine_id and ingredient_ids instead of
+    being read from select_related / prefetch caches.
+    """
+
+    def to_representation(self, recipe, is_admin):
+        cuisines = self.context.get("cuisines")
+        ingredients = self.context.get("ingredients")
+
+        if cuisines is None:
+            cuisine = recipe.cuisine
+        else:
+            cuisine = cuisines.by_id.get(recipe.cuisine_id)
+
+        if ingredients is None:
+            recipe_ingredients = recipe.ingredients.all()
+        else:
+            recipe_ingredients = sorted(
+                (
+                    ingredients.by_id[ingredient_id]
+                    for ingredient_id in recipe.ingredient_ids
+                    if ingredient_id in ingredients.by_id
+                ),
+                key=lambda ingredient: ingredient.name,
+            )
+
+        row = {
+            "id": str(recipe.id),
+            "user_id": str(recipe.user_id),
+            "cuisine": _catalog_row(cuisine) if cuisine is not None else None,
+            "name": recipe.name,
+            "description": recipe.description,
+            "ingredients": [
+                {"id": str(ingredient.id), "name": ingredient.name}
+                for ingredient in recipe_ingredients
+            ],
+            "cooking_time": recipe.cooking_time,
+            "sharing_status": recipe.sharing_status,
+            "created_at": _datetime(recipe.created_at),
+        }
+        return _admin_fields(row, recipe) if is_admin else row
+
+
+class FastRecipeSerializer(FastReadSerializer):
+    def to_representation(self, recipe, is_admin):
+        cuisine = recipe.cuisine
+        row = {
+            "id": str(recipe.id),
+            "user_id": str(recipe.user_id),
+            "cuisine": _catalog_row(cuisine) if cuisine is not None else None,
+            "name": recipe.name,
+            "description": recipe.description,
+            "preparation_steps": recipe.preparation_steps,
+            "cooking_time": recipe.cooking_time,
+            "sharing_status": recipe.sharing_status,
+            "recipe_ingredients": [
+                {
+                    "id": str(line.id),
+                    "ingredient": _catalog_row(line.ingredient),
+                    "quantity": _quantity(line.quantity),
+                    "unit": line.unit,
+                }
+                for line in recipe.recipe_ingredients.all()
+            ],
+            "created_at": _datetime(recipe.created_at),
+            "updated_at": _datetime(recipe.updated_at),
+        }
+        return _admin_fields(row, recipe) if is_admin else row
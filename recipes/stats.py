@@ -0,0 +1,95 @@
+import uuid
+from datetime import timedelta
+from django.db import connection, connections, router, transaction
+from django.utils import timezone
+from .catalog import cuisine_catalog, ingredient_catalog
+from .enums import SharingStatus
+from .models import Recipe
+from common.constants import STATS_CREATION_DAYS, STATS_TOP_INGREDIENTS
+
+# Materialized view created by migration 0012 and refreshed by
+# recipes.tasks.refresh_recipe_stats.
+STATS_VIEW = "recipes_recipe_stats"
+# One-row table holding the time of the last refresh.
+STATS_REFRESH_TABLE = "recipes_recipe_stats_refresh"
+
+# Upper bounds of the cooking time buckets; must match the width_bucket()
+# thresholds in the view definition.
+COOKING_TIME_THRESHOLDS = (15, 30, 60, 120)
+
+
+def refresh_stats():
+    # CONCURRENTLY keeps the view readable while it is rebuilt and only
+    # writes the rows whose counts changed.
+    with transaction.atomic(), connection.cursor() as cursor:
+        cursor.execute(f"REFRESH MATERIALIZED VIEW CONCURRENTLY {STATS_VIEW}")
+        cursor.execute(f"UPDATE {STATS_REFRESH_TABLE} SET refreshed_at = now()")
+
+
+def cooking_time_buckets(counts):
+    bounds = (0, *COOKING_TIME_THRESHOLDS)
+    return [
+        {
+            "min_minutes": low,
+            "max_minutes": high - 1 if high is not None else None,
+            "recipes": counts.get(str(index), 0),
+        }
+        for index, (low, high) in enumerate(zip(bounds, (*bounds[1:], None)))
+    ]
+
+
+def named(catalog, counts, key):
+    rows = []
+    for bucket, recipes in counts.items():
+        pk = uuid.UUID(bucket) if bucket else None
+        row = catalog.by_id.get(pk)
+        rows.append({key: pk, "name": row.name if row else None, "recipes": recipes})
+    rows.sort(key=lambda row: (-row["recipes"], row["name"] or ""))
+    return rows
+
+
+def tenant_stats(tenant_id):
+    """
+    Dashboard figures for a tenant's active recipes, as of the last refresh
+    of the stats view.
+    """
+    metrics = {}
+
+    with connections[router.db_for_read(Recipe)].cursor() as cursor:
+        cursor.execute(
+            f"SELECT metric, bucket, recipes FROM {STATS_VIEW} WHERE tenant_id = %s",
+            [tenant_id],
+        )
+        for metric, bucket, recipes in cursor.fetchall():
+            metrics.setdefault(metric, {})[bucket] = recipes
+
+        cursor.execute(f"SELECT refreshed_at FROM {STATS_REFRESH_TABLE}")
+        (refreshed_at,) = cursor.fetchone()
+
+    today = timezone.now().date()
+    days = [
+        (today - timedelta(days=offset)).isoformat()
+        for offset in reversed(range(STATS_CREATION_DAYS))
+    ]
+    created = metrics.get("created_on", {})
+
+    return {
+        "refreshed_at": refreshed_at,
+        "recipes": sum(metrics.get("sharing_status", {}).values()),
+        "per_cuisine": named(
+            cuisine_catalog.get(tenant_id), metrics.get("cuisine", {}), "cuisine_id"
+        ),
+        "cooking_time": cooking_time_buckets(metrics.get("cooking_time", {})),
+        "sharing_status": {
+            status: metrics.get("sharing_status", {}).get(status, 0)
+            for status in SharingStatus.values
+        },
+        "top_ingredients": named(
+            ingredient_catalog.get(tenant_id),
+            metrics.get("ingredient", {}),
+            "ingredient_id",
+        )[:STATS_TOP_INGREDIENTS],
+        "created_per_day": [
+            {"date": day, "recipes": created.get(day, 0)} for day in days
+        ],
+    }
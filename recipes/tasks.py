@@ -0,0 +1,7 @@
+from celery import shared_task
+from .stats import refresh_stats
+
+
+@shared_task
+def refresh_recipe_stats():
+    refresh_stats()
@@ -1,3 +1,724 @@
-from django.test import TestCase
+import csv
+import json
+from io import StringIO
+from pathlib import Path
+from tempfile import TemporaryDirectory
+from urllib.parse import parse_qs, urlparse
+from types import SimpleNamespace
+from datetime import timedelta
+from django.core.cache import cache
+from django.core.management import call_command
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from rest_framework.request import Request
+from rest_framework.test import APIClient, APIRequestFactory
+from common.archive import archive_soft_deleted, archive_table
+from common.constants import ARCHIVE_AFTER_DAYS
+from common.pagination import KeysetPagination
+from tenants.models import Tenant
+from users.enums import UserRole
+from users.models import User
+from .catalog import cuisine_catalog, ingredient_catalog
+from .counters import recipes_deactivated
+from .enums import SharingStatus
+from .models import Cuisine, Ingredient, Recipe, RecipeIngredient
+from .serializers import RecipeSerializer
+from .tasks import refresh_recipe_stats
+from .utils import EXPORT_COLUMNS
+from .views import RecipeViewSet
 
-# Create your tests here.
+LOCMEM_CACHES = {
+    "default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"}
+}
+
+# Size of the seeded dataset the visibility plans are checked against.
+TENANTS = 20
+USERS_PER_TENANT = 5
+RECIPES_PER_USER = 100
+
+
+def plan_nodes(plan):
+    """Every node of an EXPLAIN (FORMAT JSON) plan."""
+    yield plan
+    for child in plan.get("Plans", []):
+        yield from plan_nodes(child)
+
+
+def explain(queryset):
+    return list(plan_nodes(json.loads(queryset.explain(format="json"))[0]["Plan"]))
+
+
+class RecipeVisibilityIndexTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        tenants = Tenant.objects.bulk_create(
+            [Tenant(name=f"Tenant {index}") for index in range(TENANTS)]
+        )
+        users = User.objects.bulk_create(
+            [
+                User(
+                    username=f"user-{tenant_index}-{index}",
+                    email=f"user-{tenant_index}-{index}@example.com",
+                    password="!",
+                    tenant=tenant,
+                )
+                for tenant_index, tenant in enumerate(tenants)
+                for index in range(USERS_PER_TENANT)
+            ]
+        )
+        Recipe.objects.bulk_create(
+            [
+                Recipe(
+                    tenant_id=user.tenant_id,
+                    user=user,
+                    name=f"{user.username} recipe {index}",
+                    preparation_steps="Mix.",
+                    cooking_time=10,
+                    # One recipe in ten is shared with the tenant.
+                    sharing_status=(
+                        SharingStatus.PUBLIC
+                        if index % 10 == 0
+                        else SharingStatus.PRIVATE
+                    ),
+                )
+                for user in users
+                for index in range(RECIPES_PER_USER)
+            ],
+            batch_size=2000,
+        )
+        with connection.cursor() as cursor:
+            cursor.execute(f"ANALYZE {Recipe._meta.db_table}")
+
+        cls.user = users[0]
+
+    def get_queryset(self):
+        return RecipeViewSet().get_queryset(SimpleNamespace(user=self.user))
+
+    def test_each_visibility_branch_uses_its_partial_index(self):
+        nodes = explain(self.get_queryset().order_by().values("id"))
+
+        indexes = {node.get("Index Name") for node in nodes}
+        self.assertIn("recipe_user_active_idx", indexes)
+        self.assertIn("recipe_tenant_shared_idx", indexes)
+        self.assertNotIn("Seq Scan", {node["Node Type"] for node in nodes})
+
+    def test_listing_page_does_not_scan_the_recipe_table(self):
+        page = self.get_queryset().order_by(*RecipeViewSet.cursor_ordering)[:20]
+        nodes = explain(page)
+
+        scans = {
+            node["Node Type"]
+            for node in nodes
+            if node.get("Relation Name") == Recipe._meta.db_table
+        }
+        self.assertTrue(scans)
+        self.assertNotIn("Seq Scan", scans)
+
+
+@override_settings(CACHES=LOCMEM_CACHES)
+class RecipeWriteTestCase(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.tenant = Tenant.objects.create(name="Tenant")
+        cls.user = User.objects.create_user(
+            username="cook", email="cook@example.com", password="!", tenant=cls.tenant
+        )
+        cls.admin = User.objects.create_user(
+            username="admin",
+            email="admin@example.com",
+            password="!",
+            tenant=cls.tenant,
+            role=UserRole.ADMIN,
+        )
+        cls.cuisine = Cuisine.objects.create(tenant=cls.tenant, name="Italian")
+        cls.ingredients = Ingredient.objects.bulk_create(
+            [
+                Ingredient(tenant=cls.tenant, name=f"Ingredient {index}")
+                for index in range(40)
+            ]
+        )
+
+    def setUp(self):
+        cache.clear()
+        cuisine_catalog.clear()
+        ingredient_catalog.clear()
+        # Load the catalogs up front; they are read once per process, not
+        # once per write.
+        cuisine_catalog.get(self.tenant.id)
+        ingredient_catalog.get(self.tenant.id)
+        self.request = SimpleNamespace(user=self.user)
+
+    def lines(self, ingredients):
+        return [
+            {"ingredient_id": str(ingredient.id), "quantity": "1.00", "unit": "g"}
+            for ingredient in ingredients
+        ]
+
+    def save(self, data, instance=None):
+        serializer = RecipeSerializer(
+            instance,
+            data=data,
+            partial=instance is not None,
+            context={"request": self.request},
+        )
+        serializer.is_valid(raise_exception=True)
+        recipe = serializer.save(user=self.user, tenant=self.tenant)
+        serializer.data
+        return recipe
+
+    def create(self, name, ingredients):
+        return self.save(
+            {
+                "name": name,
+                "preparation_steps": "Mix.",
+                "cooking_time": 10,
+                "cuisine_id": str(self.cuisine.id),
+                "recipe_ingredients": self.lines(ingredients),
+            }
+        )
+
+
+class RecipeApiTestCase(RecipeWriteTestCase):
+    def setUp(self):
+        super().setUp()
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+
+class RecipeOptionsTests(RecipeApiTestCase):
+    def test_options_succeeds_for_role_serialized_viewsets(self):
+        for url in ["/api/v1/recipes/", "/api/v1/cuisines/", "/api/v1/users/"]:
+            with self.subTest(url=url):
+                self.assertEqual(self.client.options(url).status_code, 200)
+
+
+class ConditionalAndCachedReadTests(RecipeApiTestCase):
+    def setUp(self):
+        super().setUp()
+        self.client.force_authenticate(self.admin)
+
+    def test_cached_cuisine_list_follows_recipe_counts(self):
+        url = "/api/v1/cuisines/?ordering=popular"
+        self.assertEqual(
+            self.client.get(url).data["results"][0]["active_recipe_count"], 0
+        )
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.create("Soup", self.ingredients[:1])
+
+        response = self.client.get(url)
+        self.assertEqual(response["X-Cache"], "MISS")
+        self.assertEqual(response.data["results"][0]["active_recipe_count"], 1)
+
+    def test_cuisine_etag_changes_with_its_recipe_count(self):
+        url = f"/api/v1/cuisines/{self.cuisine.id}/"
+        etag = self.client.get(url)["ETag"]
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.create("Soup", self.ingredients[:1])
+
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data["active_recipe_count"], 1)
+
+    def test_recipe_etag_changes_when_it_is_deleted(self):
+        recipe = self.create("Soup", self.ingredients[:1])
+        url = f"/api/v1/recipes/{recipe.id}/"
+        etag = self.client.get(url)["ETag"]
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.assertEqual(self.client.delete(url).status_code, 204)
+
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertFalse(response.data["is_active"])
+
+
+class RecipeBulkCreateTests(RecipeApiTestCase):
+    def item(self, name, ingredients, **fields):
+        return {
+            "name": name,
+            "preparation_steps": "Mix.",
+            "cooking_time": 10,
+            "cuisine_id": str(self.cuisine.id),
+            "recipe_ingredients": self.lines(ingredients),
+            **fields,
+        }
+
+    def inserts(self, context, model):
+        table = f'INSERT INTO "{model._meta.db_table}"'
+        return [q for q in context.captured_queries if q["sql"].startswith(table)]
+
+    def test_reports_errors_per_item_and_inserts_the_rest_at_once(self):
+        self.create("Soup", self.ingredients[:1])
+        items = [
+            self.item("Stew", self.ingredients[:2]),
+            self.item("Soup", self.ingredients[:1]),
+            self.item("Salad", self.ingredients[:1], cooking_time="soon"),
+            self.item("Pie", self.ingredients[:1], cuisine_id=str(self.tenant.id)),
+            self.item("Cake", self.ingredients[:1] * 2),
+            self.item("Bread", self.ingredients[2:5]),
+        ]
+
+        with CaptureQueriesContext(connection) as context:
+            response = self.client.post("/api/v1/recipes/bulk/", items, format="json")
+
+        self.assertEqual(response.status_code, 207)
+        self.assertEqual(response.data["created"], 2)
+        self.assertEqual(response.data["failed"], 4)
+        results = response.data["results"]
+        self.assertEqual([result["index"] for result in results], list(range(6)))
+        self.assertEqual(
+            results[1]["errors"], {"name": ["A recipe with this name already exists."]}
+        )
+        self.assertIn("cooking_time", results[2]["errors"])
+        self.assertIn("cuisine_id", results[3]["errors"])
+        self.assertIn("recipe_ingredients", results[4]["errors"])
+        self.assertEqual(
+            set(Recipe.objects.values_list("name", flat=True)),
+            {"Soup", "Stew", "Bread"},
+        )
+
+        self.assertEqual(len(self.inserts(context, Recipe)), 1)
+        self.assertEqual(len(self.inserts(context, RecipeIngredient)), 1)
+        self.assertEqual(
+            sorted(Recipe.objects.get(name="Bread").ingredient_ids),
+            sorted(ingredient.id for ingredient in self.ingredients[2:5]),
+        )
+        call_command("reconcile_recipe_counts", "--check", stdout=StringIO())
+
+    def test_rejects_an_empty_batch(self):
+        response = self.client.post("/api/v1/recipes/bulk/", [], format="json")
+
+        self.assertEqual(response.status_code, 400)
+
+
+class RecipeExportTests(RecipeApiTestCase):
+    def setUp(self):
+        super().setUp()
+        self.soup = self.create("Soup", self.ingredients[:2])
+        self.stew = self.create("Stew", [])
+        Recipe.objects.filter(pk=self.stew.pk).soft_delete()
+        self.client.force_authenticate(self.admin)
+
+    def export(self, export_format):
+        response = self.client.get(f"/api/v1/recipes/export/?format={export_format}")
+        self.assertEqual(response.status_code, 200)
+        return b"".join(response.streaming_content).decode()
+
+    def test_ndjson_streams_one_object_per_recipe(self):
+        rows = [json.loads(line) for line in self.export("ndjson").splitlines()]
+
+        self.assertEqual([row["name"] for row in rows], ["Soup", "Stew"])
+        self.assertEqual([row["is_active"] for row in rows], [True, False])
+        self.assertEqual(rows[0]["cuisine"], "Italian")
+        self.assertEqual(
+            [line["name"] for line in rows[0]["ingredients"]],
+            ["Ingredient 0", "Ingredient 1"],
+        )
+        self.assertEqual(rows[1]["ingredients"], [])
+
+    def test_csv_has_a_header_and_one_row_per_recipe(self):
+        rows = list(csv.reader(StringIO(self.export("csv"))))
+
+        self.assertEqual(rows[0], EXPORT_COLUMNS + ["ingredients"])
+        self.assertEqual(
+            [row[rows[0].index("name")] for row in rows[1:]], ["Soup", "Stew"]
+        )
+        self.assertEqual(len(json.loads(rows[1][-1])), 2)
+
+    def test_errors_are_rendered_as_json(self):
+        self.client.force_authenticate(self.user)
+
+        response = self.client.get("/api/v1/recipes/export/?format=csv")
+
+        self.assertEqual(response.status_code, 403)
+        self.assertEqual(response["Content-Type"], "application/json")
+
+
+class RecipeImportTests(RecipeApiTestCase):
+    def setUp(self):
+        super().setUp()
+        self.create("Soup", self.ingredients[:2])
+        stew = self.create("Stew", self.ingredients[1:3])
+        Recipe.objects.filter(pk=stew.pk).soft_delete()
+        recipes_deactivated(self.tenant.id, [(stew.cuisine_id, stew.ingredient_ids)])
+
+        self.client.force_authenticate(self.admin)
+        response = self.client.get("/api/v1/recipes/export/?format=ndjson")
+        self.exported = b"".join(response.streaming_content).decode()
+
+        self.target = Tenant.objects.create(name="Target")
+        self.owner = User.objects.create_user(
+            username="owner",
+            email="owner@example.com",
+            password="!",
+            tenant=self.target,
+        )
+
+    def import_file(self, content):
+        with TemporaryDirectory() as directory:
+            path = Path(directory) / "recipes.ndjson"
+            path.write_text(content)
+            call_command(
+                "import_recipes",
+                str(path),
+                tenant=str(self.target.id),
+                user=self.owner.email,
+                stdout=StringIO(),
+                stderr=StringIO(),
+            )
+
+    def test_round_trip_recreates_recipes_lines_and_state(self):
+        # A soft-deleted catalog row of the same name is reused and revived.
+        Cuisine.objects.create(
+            tenant=self.target,
+            name="Italian",
+            is_active=False,
+            deleted_at=timezone.now(),
+        )
+
+        self.import_file(self.exported)
+
+        recipes = {
+            recipe.name: recipe
+            for recipe in Recipe.objects.filter(tenant=self.target).select_related(
+                "cuisine"
+            )
+        }
+        self.assertEqual(set(recipes), {"Soup", "Stew"})
+        self.assertTrue(recipes["Soup"].is_active)
+        self.assertFalse(recipes["Stew"].is_active)
+        self.assertIsNotNone(recipes["Stew"].deleted_at)
+        self.assertTrue(recipes["Soup"].cuisine.is_active)
+        self.assertEqual(
+            sorted(
+                recipes["Soup"].recipe_ingredients.values_list(
+                    "ingredient__name", flat=True
+                )
+            ),
+            ["Ingredient 0", "Ingredient 1"],
+        )
+        self.assertEqual(
+            set(recipes["Soup"].ingredient_ids),
+            set(
+                recipes["Soup"].recipe_ingredients.values_list(
+                    "ingredient_id", flat=True
+                )
+            ),
+        )
+
+        self.target.refresh_from_db()
+        self.assertEqual(self.target.active_recipe_count, 1)
+        call_command("reconcile_recipe_counts", "--check", stdout=StringIO())
+
+    def test_invalid_records_are_skipped(self):
+        rows = [json.loads(line) for line in self.exported.splitlines()]
+        rows[0]["cooking_time"] = -1
+        rows[1]["ingredients"][0]["quantity"] = "1.234"
+
+        self.import_file("".join(json.dumps(row) + "\n" for row in rows))
+
+        self.assertFalse(Recipe.objects.filter(tenant=self.target).exists())
+
+
+class ArchiveTests(RecipeApiTestCase):
+    def setUp(self):
+        super().setUp()
+        self.client.force_authenticate(self.admin)
+        self.long_ago = timezone.now() - timedelta(days=ARCHIVE_AFTER_DAYS + 1)
+
+        self.deleted = self.create("Soup", self.ingredients[:2])
+        self.live = self.create("Stew", self.ingredients[:1])
+        self.greek = Cuisine.objects.create(tenant=self.tenant, name="Greek")
+        for model, pks in [
+            (Recipe, [self.deleted.pk]),
+            (Cuisine, [self.greek.pk, self.cuisine.pk]),
+        ]:
+            model.objects.filter(pk__in=pks).update(
+                is_active=False, deleted_at=self.long_ago
+            )
+
+    def archive(self):
+        return archive_soft_deleted(timezone.now() - timedelta(days=1), 100)
+
+    def test_moves_old_soft_deleted_rows_out_of_the_live_tables(self):
+        moved = self.archive()
+
+        self.assertEqual(moved[Recipe._meta.label], 1)
+        # Italian is still used by a live recipe and stays.
+        self.assertEqual(moved[Cuisine._meta.label], 1)
+        self.assertEqual(set(Recipe.objects.values_list("name", flat=True)), {"Stew"})
+        self.assertFalse(RecipeIngredient.objects.filter(recipe=self.deleted.pk))
+        self.assertTrue(Cuisine.objects.filter(pk=self.cuisine.pk).exists())
+        self.assertFalse(Cuisine.objects.filter(pk=self.greek.pk).exists())
+
+        with connection.cursor() as cursor:
+            cursor.execute(f"SELECT name FROM {archive_table(Recipe)}")
+            self.assertEqual(cursor.fetchall(), [("Soup",)])
+
+    def test_recreating_an_archived_cuisine_restores_it(self):
+        self.archive()
+
+        response = self.client.post(
+            "/api/v1/cuisines/", {"name": "Greek"}, format="json"
+        )
+
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(response.data["id"], str(self.greek.pk))
+        self.assertTrue(response.data["is_active"])
+        self.assertTrue(Cuisine.active_objects.filter(pk=self.greek.pk).exists())
+
+    def test_active_objects_skips_soft_deleted_rows(self):
+        self.assertEqual(
+            set(Cuisine.active_objects.values_list("name", flat=True)), set()
+        )
+        self.assertEqual(
+            set(Cuisine.objects.values_list("name", flat=True)), {"Italian", "Greek"}
+        )
+
+        self.client.force_authenticate(self.user)
+        response = self.client.get(f"/api/v1/cuisines/{self.greek.pk}/")
+        self.assertEqual(response.status_code, 404)
+
+
+class RecipeStatsTests(RecipeApiTestCase):
+    def setUp(self):
+        super().setUp()
+        self.create("Soup", self.ingredients[:2])
+        self.save(
+            {
+                "name": "Stew",
+                "preparation_steps": "Simmer.",
+                "cooking_time": 45,
+                "sharing_status": SharingStatus.PUBLIC,
+                "cuisine_id": str(self.cuisine.id),
+                "recipe_ingredients": self.lines(self.ingredients[:1]),
+            }
+        )
+        deleted = self.create("Pie", self.ingredients[:1])
+        Recipe.objects.filter(pk=deleted.pk).soft_delete()
+
+        self.client.force_authenticate(self.admin)
+
+    def stats(self):
+        response = self.client.get("/api/v1/recipes/stats/")
+        self.assertEqual(response.status_code, 200)
+        return response.data
+
+    def test_figures_change_only_when_the_view_is_refreshed(self):
+        stale = self.stats()
+        self.assertEqual(stale["recipes"], 0)
+
+        refresh_recipe_stats()
+        stats = self.stats()
+
+        self.assertGreater(stats["refreshed_at"], stale["refreshed_at"])
+        self.assertEqual(stats["recipes"], 2)
+        self.assertEqual(
+            stats["per_cuisine"],
+            [{"cuisine_id": self.cuisine.id, "name": "Italian", "recipes": 2}],
+        )
+        self.assertEqual(
+            [bucket["recipes"] for bucket in stats["cooking_time"]], [1, 0, 1, 0, 0]
+        )
+        self.assertEqual(stats["sharing_status"], {"PUBLIC": 1, "PRIVATE": 1})
+        self.assertEqual(
+            stats["top_ingredients"][0],
+            {
+                "ingredient_id": self.ingredients[0].id,
+                "name": "Ingredient 0",
+                "recipes": 2,
+            },
+        )
+        self.assertEqual(stats["created_per_day"][-1]["recipes"], 2)
+
+    def test_other_tenants_are_not_counted(self):
+        other = Tenant.objects.create(name="Other")
+        admin = User.objects.create_user(
+            username="other",
+            email="other@example.com",
+            password="!",
+            tenant=other,
+            role=UserRole.ADMIN,
+        )
+        refresh_recipe_stats()
+
+        self.client.force_authenticate(admin)
+        self.assertEqual(self.stats()["recipes"], 0)
+
+    def test_requires_an_admin(self):
+        self.client.force_authenticate(self.user)
+
+        response = self.client.get("/api/v1/recipes/stats/")
+
+        self.assertEqual(response.status_code, 403)
+
+
+class RecipeWriteQueryCountTests(RecipeWriteTestCase):
+    def count_queries(self, write):
+        with CaptureQueriesContext(connection) as context:
+            write()
+        return len(context.captured_queries)
+
+    def test_create_runs_the_same_queries_for_1_and_20_ingredients(self):
+        one = self.count_queries(lambda: self.create("One", self.ingredients[:1]))
+        many = self.count_queries(lambda: self.create("Many", self.ingredients[:20]))
+
+        self.assertEqual(one, many)
+
+    def test_update_runs_the_same_queries_for_1_and_20_ingredients(self):
+        small = self.create("Small", self.ingredients[:1])
+        large = self.create("Large", self.ingredients[:20])
+
+        one = self.count_queries(
+            lambda: self.save(
+                {"recipe_ingredients": self.lines(self.ingredients[1:2])}, small
+            )
+        )
+        many = self.count_queries(
+            lambda: self.save(
+                {"recipe_ingredients": self.lines(self.ingredients[20:40])}, large
+            )
+        )
+
+        self.assertEqual(one, many)
+
+
+class RecipeIngredientDiffTests(RecipeWriteTestCase):
+    def test_update_touches_only_added_changed_and_removed_lines(self):
+        recipe = self.create("Soup", self.ingredients[:3])
+        before = {line.ingredient_id: line for line in recipe.recipe_ingredients.all()}
+        kept, changed, removed = self.ingredients[:3]
+        added = self.ingredients[3]
+
+        lines = self.lines([kept, changed, added])
+        lines[1]["quantity"] = "2.50"
+        self.save({"recipe_ingredients": lines}, recipe)
+
+        after = {line.ingredient_id: line for line in recipe.recipe_ingredients.all()}
+        self.assertEqual(set(after), {kept.id, changed.id, added.id})
+        self.assertEqual(after[kept.id].id, before[kept.id].id)
+        self.assertEqual(after[kept.id].updated_at, before[kept.id].updated_at)
+        self.assertEqual(after[changed.id].id, before[changed.id].id)
+        self.assertEqual(str(after[changed.id].quantity), "2.50")
+        self.assertNotEqual(after[added.id].id, before[removed.id].id)
+        self.assertFalse(RecipeIngredient.objects.filter(id=before[removed.id].id))
+
+        recipe.refresh_from_db()
+        self.assertEqual(
+            sorted(recipe.ingredient_ids), sorted([kept.id, changed.id, added.id])
+        )
+
+
+class RecipeUsageCounterTests(RecipeWriteTestCase):
+    def counts(self):
+        self.cuisine.refresh_from_db()
+        return self.cuisine.active_recipe_count, {
+            ingredient.name: ingredient.active_recipe_count
+            for ingredient in Ingredient.objects.filter(
+                pk__in=[ingredient.pk for ingredient in self.ingredients[:3]]
+            )
+        }
+
+    def test_counts_follow_create_update_and_delete(self):
+        recipe = self.create("Soup", self.ingredients[:2])
+        self.create("Stew", self.ingredients[1:3])
+        self.assertEqual(
+            self.counts(),
+            (2, {"Ingredient 0": 1, "Ingredient 1": 2, "Ingredient 2": 1}),
+        )
+
+        self.save({"recipe_ingredients": self.lines(self.ingredients[2:3])}, recipe)
+        self.assertEqual(
+            self.counts(),
+            (2, {"Ingredient 0": 0, "Ingredient 1": 1, "Ingredient 2": 2}),
+        )
+
+        Recipe.objects.filter(pk=recipe.pk).soft_delete()
+        recipes_deactivated(
+            self.tenant.id, [(recipe.cuisine_id, recipe.ingredient_ids)]
+        )
+        self.assertEqual(
+            self.counts(),
+            (1, {"Ingredient 0": 0, "Ingredient 1": 1, "Ingredient 2": 1}),
+        )
+
+        self.tenant.refresh_from_db()
+        self.assertEqual(self.tenant.active_recipe_count, 1)
+        call_command("reconcile_recipe_counts", "--check", stdout=StringIO())
+
+    def test_update_from_a_stale_instance_keeps_the_latest_lines(self):
+        recipe = self.create("Soup", self.ingredients[:2])
+        stale = Recipe.objects.get(pk=recipe.pk)
+
+        self.save({"recipe_ingredients": self.lines(self.ingredients[2:4])}, recipe)
+        self.save({"name": "Broth"}, stale)
+
+        recipe.refresh_from_db()
+        self.assertEqual(recipe.name, "Broth")
+        self.assertEqual(
+            set(recipe.ingredient_ids),
+            set(recipe.recipe_ingredients.values_list("ingredient_id", flat=True)),
+        )
+        call_command("reconcile_recipe_counts", "--check", stdout=StringIO())
+
+
+class KeysetPaginationTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        tenant = Tenant.objects.create(name="Tenant")
+        user = User.objects.create_user(
+            username="cook", email="cook@example.com", password="!", tenant=tenant
+        )
+        Recipe.objects.bulk_create(
+            [
+                Recipe(
+                    tenant=tenant,
+                    user=user,
+                    name=f"Recipe {index}",
+                    preparation_steps="Mix.",
+                    cooking_time=10,
+                )
+                for index in range(10)
+            ]
+        )
+        # Ties on created_at must be broken by id without skipping rows.
+        Recipe.objects.filter(name__in=["Recipe 2", "Recipe 3", "Recipe 4"]).update(
+            created_at=timezone.now()
+        )
+
+    def page(self, cursor=None):
+        params = {"pagination": "cursor", "page_size": 3}
+        if cursor:
+            params["cursor"] = cursor
+        request = Request(APIRequestFactory().get("/recipes/", params))
+        paginator = KeysetPagination(("-created_at", "-id"))
+        rows = paginator.paginate_queryset(Recipe.objects.all(), request)
+        return paginator, [row.id for row in rows]
+
+    def cursor(self, link):
+        return parse_qs(urlparse(link).query)["cursor"][0]
+
+    def test_pages_cover_every_row_once_in_order(self):
+        expected = list(
+            Recipe.objects.order_by("-created_at", "-id").values_list("id", flat=True)
+        )
+
+        seen = []
+        paginator, ids = self.page()
+        seen += ids
+        while paginator.get_next_link():
+            paginator, ids = self.page(self.cursor(paginator.get_next_link()))
+            seen += ids
+
+        self.assertEqual(seen, expected)
+
+    def test_previous_link_returns_the_preceding_page(self):
+        first, first_ids = self.page()
+        second, _ = self.page(self.cursor(first.get_next_link()))
+        _, previous_ids = self.page(self.cursor(second.get_previous_link()))
+
+        self.assertEqual(previous_ids, first_ids)
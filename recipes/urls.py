@@ -1,6 +1,7 @@
 from django.urls import path, include
 from rest_framework.routers import DefaultRouter
 from .views import CuisineViewSet, IngredientViewSet, RecipeViewSet
+from .async_views import AsyncCuisineView, AsyncIngredientView, AsyncRecipeView
 
 router = DefaultRouter()
 router.register(r"cuisines", CuisineViewSet, basename="cuisine")
@@ -10,4 +11,27 @@ router.register(r"recipes", RecipeViewSet, basename="recipe")
 
 urlpatterns = [
     path("", include(router.urls)),
+    # Native async read endpoints, for deployments served over ASGI.
+    path("async/cuisines/", AsyncCuisineView.as_view(), name="async_cuisine_list"),
+    path(
+        "async/cuisines/<uuid:pk>/",
+        AsyncCuisineView.as_view(),
+        name="async_cuisine_detail",
+    ),
+    path(
+        "async/ingredients/",
+        AsyncIngredientView.as_view(),
+        name="async_ingredient_list",
+    ),
+    path(
+        "async/ingredients/<uuid:pk>/",
+        AsyncIngredientView.as_view(),
+        name="async_ingredient_detail",
+    ),
+    path("async/recipes/", AsyncRecipeView.as_view(), name="async_recipe_list"),
+    path(
+        "async/recipes/<uuid:pk>/",
+        AsyncRecipeView.as_view(),
+        name="async_recipe_detail",
+    ),
 ]
@@ -0,0 +1,241 @@
+import csv
+import json
+from django.core.cache import cache
+from django.db import transaction
+from django.contrib.postgres.search import TrigramSimilarity
+from django.db.models import Case, IntegerField, Value, When
+from .enums import SharingStatus
+from .models import Recipe, RecipeIngredient
+from .catalog import cuisine_catalog, ingredient_catalog
+from .counters import recipes_activated
+from .serializers import BulkRecipeSerializer
+from common.cache import get_version
+from common.constants import AUTOCOMPLETE_CACHE_TTL
+from common.db_router import PRIMARY
+
+
+def autocomplete_key(namespace, tenant_id, term, limit):
+    # Reuse the catalog's response cache version so writes invalidate it.
+    version = get_version(namespace, tenant_id)
+    return f"autocomplete:{namespace}:{tenant_id}:{version}:{limit}:{term}"
+
+
+def autocomplete(model, namespace, tenant_id, term, limit):
+    """
+    Top `limit` active names of `model` in the tenant containing `term`,
+    prefix matches first, then by trigram similarity. Results are cached
+    per tenant and normalized term.
+    """
+    term = " ".join(term.split()).lower()
+    key = autocomplete_key(namespace, tenant_id, term, limit)
+
+    results = cache.get(key)
+    if results is not None:
+        return results
+
+    # icontains compiles to UPPER(name) LIKE ..., which is served by the
+    # UPPER(name) gin_trgm_ops indexes. Read from the primary: a lagging
+    # replica could cache pre-write names under the post-write version.
+    queryset = (
+        model.active_objects.using(PRIMARY)
+        .filter(tenant_id=tenant_id, name__icontains=term)
+        .annotate(
+            is_prefix=Case(
+                When(name__istartswith=term, then=Value(0)),
+                default=Value(1),
+                output_field=IntegerField(),
+            ),
+            similarity=TrigramSimilarity("name", term),
+        )
+        .order_by("is_prefix", "-similarity", "name")
+        .values("id", "name")[:limit]
+    )
+    results = [{"id": str(row["id"]), "name": row["name"]} for row in queryset]
+
+    cache.set(key, results, timeout=AUTOCOMPLETE_CACHE_TTL)
+    return results
+
+
+def bulk_create_recipes(items, user):
+    """
+    Validate and insert a batch of recipes for `user`'s tenant with a
+    fixed number of queries. Returns one result per item, in order; only
+    valid items are inserted.
+    """
+    tenant_id = user.tenant_id
+    results = [None] * len(items)
+    valid = []
+
+    for index, item in enumerate(items):
+        serializer = BulkRecipeSerializer(data=item)
+        if serializer.is_valid():
+            valid.append((index, serializer.validated_data))
+        else:
+            results[index] = {"index": index, "errors": serializer.errors}
+
+    names = {data["name"] for _, data in valid}
+
+    cuisines = cuisine_catalog.get(tenant_id)
+    ingredients = ingredient_catalog.get(tenant_id)
+    taken_names = set(
+        Recipe.objects.filter(tenant_id=tenant_id, name__in=names).values_list(
+            "name", flat=True
+        )
+    )
+
+    recipes = []
+    recipe_ingredients = []
+
+    for index, data in valid:
+        errors = {}
+        lines = data.get("recipe_ingredients", [])
+        line_ids = [line["ingredient_id"] for line in lines]
+
+        if data["name"] in taken_names:
+            errors["name"] = ["A recipe with this name already exists."]
+
+        cuisine_id = data.get("cuisine_id")
+        cuisine = cuisines.get_active(cuisine_id) if cuisine_id is not None else None
+        if cuisine_id is not None and cuisine is None:
+            errors["cuisine_id"] = ["Cuisine does not exist or is inactive."]
+
+        if any(ingredients.get_active(line_id) is None for line_id in line_ids):
+            errors["recipe_ingredients"] = ["Ingredient does not exist or is inactive."]
+        elif len(set(line_ids)) != len(line_ids):
+            errors["recipe_ingredients"] = ["Each ingredient can only be listed once."]
+
+        if errors:
+            results[index] = {"index": index, "errors": errors}
+            continue
+
+        taken_names.add(data["name"])
+
+        recipe = Recipe(
+            tenant_id=tenant_id,
+            user=user,
+            cuisine=cuisine,
+            name=data["name"],
+            description=data.get("description", ""),
+            preparation_steps=data["preparation_steps"],
+            cooking_time=data["cooking_time"],
+            sharing_status=data.get("sharing_status", SharingStatus.PRIVATE),
+            ingredient_ids=line_ids,
+        )
+        recipes.append(recipe)
+        recipe_ingredients.extend(
+            RecipeIngredient(
+                tenant_id=tenant_id,
+                recipe=recipe,
+                ingredient_id=line["ingredient_id"],
+                quantity=line["quantity"],
+                unit=line["unit"],
+            )
+            for line in lines
+        )
+        results[index] = {"index": index, "id": str(recipe.id), "name": recipe.name}
+
+    if recipes:
+        with transaction.atomic():
+            Recipe.objects.bulk_create(recipes)
+            RecipeIngredient.objects.bulk_create(recipe_ingredients)
+            recipes_activated(
+                user.tenant_id,
+                [(recipe.cuisine_id, recipe.ingredient_ids) for recipe in recipes],
+            )
+
+    return results
+
+
+class Echo:
+    """File-like object whose write() hands the value back, for csv.writer."""
+
+    def write(self, value):
+        return value
+
+
+EXPORT_COLUMNS = [
+    "id",
+    "user_id",
+    "cuisine",
+    "name",
+    "description",
+    "preparation_steps",
+    "cooking_time",
+    "sharing_status",
+    "is_active",
+    "created_at",
+    "updated_at",
+]
+
+
+def iter_export_rows(recipes, chunk_size):
+    """
+    Yield export dicts for `recipes` from a server-side cursor, loading the
+    ingredient lines of each chunk with one extra query.
+    """
+    rows = recipes.values_list(
+        "id",
+        "user_id",
+        "cuisine__name",
+        "name",
+        "description",
+        "preparation_steps",
+        "cooking_time",
+        "sharing_status",
+        "is_active",
+        "created_at",
+        "updated_at",
+    ).iterator(chunk_size=chunk_size)
+
+    chunk = []
+    for row in rows:
+        chunk.append(row)
+        if len(chunk) >= chunk_size:
+            yield from _export_chunk(chunk, recipes.db)
+            chunk = []
+    if chunk:
+        yield from _export_chunk(chunk, recipes.db)
+
+
+def _export_chunk(chunk, using):
+    lines = {}
+    for recipe_id, ingredient_id, name, quantity, unit in (
+        RecipeIngredient.objects.using(using)
+        .filter(recipe_id__in=[row[0] for row in chunk])
+        .order_by("recipe_id", "ingredient__name")
+        .values_list(
+            "recipe_id", "ingredient_id", "ingredient__name", "quantity", "unit"
+        )
+    ):
+        lines.setdefault(recipe_id, []).append(
+            {
+                "ingredient_id": str(ingredient_id),
+                "name": name,
+                "quantity": str(quantity),
+                "unit": unit,
+            }
+        )
+
+    for row in chunk:
+        data = dict(zip(EXPORT_COLUMNS, row))
+        data["id"] = str(data["id"])
+        data["user_id"] = str(data["user_id"])
+        data["created_at"] = data["created_at"].isoformat()
+        data["updated_at"] = data["updated_at"].isoformat()
+        data["ingredients"] = lines.get(row[0], [])
+        yield data
+
+
+def stream_ndjson(rows):
+    for data in rows:
+        yield json.dumps(data) + "\n"
+
+
+def stream_csv(rows):
+    writer = csv.writer(Echo())
+    yield writer.writerow(EXPORT_COLUMNS + ["ingredients"])
+    for data in rows:
+        yield writer.writerow(
+            [data[column] for column in EXPORT_COLUMNS]
+            + [json.dumps(data["ingredients"])]
+        )
@@ -1,22 +1,82 @@
 from django.utils import timezone
 from django.shortcuts import get_object_or_404
-from django.db.models import Q
+from django.http import StreamingHttpResponse
+from django.db import transaction
+from django.db.models import F, Q
+from django.contrib.postgres.search import SearchQuery, SearchRank
 from rest_framework.response import Response
 from rest_framework import viewsets, status
+from rest_framework.decorators import action
 from rest_framework.permissions import IsAuthenticated
-from .models import Cuisine, Ingredient, Recipe, RecipeIngredient
+from rest_framework.exceptions import ValidationError
+from rest_framework.renderers import JSONRenderer
+from .models import Cuisine, Ingredient, Recipe
+from .enums import IngredientMatch, SharingStatus
 from .permissions import IsAdmin, IsOwnerOrAdmin, CanViewRecipe
 from .serializers import (
     CuisineSerializer,
+    AdminCuisineSerializer,
     IngredientSerializer,
+    AdminIngredientSerializer,
     RecipeSerializer,
-    RecipeListSerializer,
+    AdminRecipeSerializer,
+    FastRecipeSerializer,
+    FastRecipeListSerializer,
+)
+from .catalog import cuisine_catalog, ingredient_catalog
+from .stats import tenant_stats
+from .counters import recipes_deactivated
+from .utils import (
+    autocomplete,
+    bulk_create_recipes,
+    iter_export_rows,
+    stream_csv,
+    stream_ndjson,
+)
+from common.archive import restore_archived
+from common.db_router import ReplicaReadMixin
+from common.mixins import AdminSerializerMixin
+from common.pagination import get_ordering, get_paginator, uses_cursor
+from common.renderers import CSVRenderer, NDJSONRenderer
+from common.cache import bump_version, cache_response, conditional_detail
+from common.constants import (
+    AUTOCOMPLETE_DEFAULT_LIMIT,
+    AUTOCOMPLETE_MAX_LIMIT,
+    BULK_CREATE_MAX_ITEMS,
+    EXPORT_CHUNK_SIZE,
+    CUISINES_CACHE_NAMESPACE,
+    INGREDIENTS_CACHE_NAMESPACE,
+    RECIPES_CACHE_NAMESPACE,
+    RECIPE_USAGE_CACHE_NAMESPACE,
 )
-from common.pagination import DefaultPagination
 from users.enums import UserRole
 
 
-class CuisineViewSet(viewsets.ViewSet):
+def autocomplete_response(request, model, namespace):
+    term = request.query_params.get("q", "").strip()
+    if not term:
+        raise ValidationError({"q": "This query parameter is required."})
+
+    try:
+        limit = int(request.query_params.get("limit", AUTOCOMPLETE_DEFAULT_LIMIT))
+    except ValueError:
+        raise ValidationError({"limit": "A valid integer is required."})
+    limit = max(1, min(limit, AUTOCOMPLETE_MAX_LIMIT))
+
+    results = autocomplete(model, namespace, request.user.tenant_id, term, limit)
+    return Response({"results": results}, status=status.HTTP_200_OK)
+
+
+class CuisineViewSet(AdminSerializerMixin, ReplicaReadMixin, viewsets.ViewSet):
+    serializer_class = CuisineSerializer
+    admin_serializer_class = AdminCuisineSerializer
+    # "popular" walks cuisine_popular_idx; both end on id so they are unique
+    # and usable as keyset cursors.
+    orderings = {
+        "name": ("name", "id"),
+        "popular": ("-active_recipe_count", "name", "id"),
+    }
+
     def get_permissions(self):
         if self.action in ["create", "partial_update", "destroy"]:
             permission_classes = [IsAuthenticated, IsAdmin]
@@ -27,58 +87,84 @@ class CuisineViewSet(viewsets.ViewSet):
 
     def get_queryset(self, request):
         if request.user.role == UserRole.ADMIN:
-            return Cuisine.objects.all()
-        return Cuisine.objects.filter(is_active=True)
+            return Cuisine.objects.filter(tenant_id=request.user.tenant_id)
+        return Cuisine.active_objects.filter(tenant_id=request.user.tenant_id)
 
+    def get_ordering(self, request):
+        return get_ordering(request, self.orderings)
+
+    @cache_response(CUISINES_CACHE_NAMESPACE, embeds=(RECIPE_USAGE_CACHE_NAMESPACE,))
     def list(self, request):
-        cuisines = self.get_queryset(request)
+        ordering = self.get_ordering(request)
+        cuisines = self.get_queryset(request).order_by(*ordering)
 
-        paginator = DefaultPagination()
+        paginator = get_paginator(request, ordering)
         paginated_qs = paginator.paginate_queryset(cuisines, request)
 
-        serializer = CuisineSerializer(
-            paginated_qs, many=True, context={"request": request}
-        )
+        serializer = self.get_role_serializer(request, paginated_qs, many=True)
         return paginator.get_paginated_response(serializer.data)
 
+    @action(detail=False, methods=["get"])
+    def autocomplete(self, request):
+        return autocomplete_response(request, Cuisine, CUISINES_CACHE_NAMESPACE)
+
+    @conditional_detail(
+        CUISINES_CACHE_NAMESPACE, embeds=(RECIPE_USAGE_CACHE_NAMESPACE,)
+    )
     def retrieve(self, request, pk=None):
         cuisines = self.get_queryset(request)
         cuisine = get_object_or_404(cuisines, pk=pk)
-        serializer = CuisineSerializer(cuisine, context={"request": request})
+        serializer = self.get_role_serializer(request, cuisine)
         return Response(serializer.data, status=status.HTTP_200_OK)
 
     def create(self, request):
         name = request.data.get("name")
 
-        old = Cuisine.objects.filter(name=name, is_active=False).first()
+        if name:
+            restore_archived(Cuisine, tenant_id=request.user.tenant_id, name=name)
+
+        old = Cuisine.objects.filter(
+            tenant_id=request.user.tenant_id, name=name, is_active=False
+        ).first()
 
         if old:
             old.is_active = True
             old.deleted_at = None
             old.save()
-            serializer = CuisineSerializer(old, context={"request": request})
+            bump_version(
+                old.tenant_id, CUISINES_CACHE_NAMESPACE, RECIPES_CACHE_NAMESPACE
+            )
+            serializer = self.get_role_serializer(request, old)
             return Response(serializer.data, status=status.HTTP_201_CREATED)
 
-        serializer = CuisineSerializer(data=request.data, context={"request": request})
+        serializer = self.get_role_serializer(request, data=request.data)
         serializer.is_valid(raise_exception=True)
-        serializer.save()
+        serializer.save(tenant=request.user.tenant)
+        bump_version(
+            request.user.tenant_id, CUISINES_CACHE_NAMESPACE, RECIPES_CACHE_NAMESPACE
+        )
         return Response(serializer.data, status=status.HTTP_201_CREATED)
 
     def partial_update(self, request, pk=None):
-        cuisine = get_object_or_404(Cuisine, pk=pk, is_active=True)
-        serializer = CuisineSerializer(
-            cuisine, data=request.data, partial=True, context={"request": request}
+        cuisine = get_object_or_404(
+            Cuisine.active_objects, pk=pk, tenant_id=request.user.tenant_id
+        )
+        serializer = self.get_role_serializer(
+            request, cuisine, data=request.data, partial=True
         )
         serializer.is_valid(raise_exception=True)
         serializer.save()
+        bump_version(
+            cuisine.tenant_id, CUISINES_CACHE_NAMESPACE, RECIPES_CACHE_NAMESPACE
+        )
         return Response(serializer.data, status=status.HTTP_200_OK)
 
     def destroy(self, request, pk=None):
-        cuisine = get_object_or_404(Cuisine, pk=pk, is_active=True)
-
-        is_used = Recipe.objects.filter(cuisine=cuisine, is_active=True).exists()
+        cuisine = get_object_or_404(
+            Cuisine.active_objects, pk=pk, tenant_id=request.user.tenant_id
+        )
 
-        if is_used:
+        if cuisine.active_recipe_count > 0:
             return Response(
                 {
                     "error": "Cannot delete cuisine because it is used in one or more active recipes."
@@ -89,13 +175,23 @@ class CuisineViewSet(viewsets.ViewSet):
         cuisine.is_active = False
         cuisine.deleted_at = timezone.now()
         cuisine.save()
+        bump_version(
+            cuisine.tenant_id, CUISINES_CACHE_NAMESPACE, RECIPES_CACHE_NAMESPACE
+        )
 
         return Response(status=status.HTTP_204_NO_CONTENT)
 
 
-class IngredientViewSet(viewsets.ViewSet):
+class IngredientViewSet(AdminSerializerMixin, ReplicaReadMixin, viewsets.ViewSet):
+    serializer_class = IngredientSerializer
+    admin_serializer_class = AdminIngredientSerializer
     lookup_field = "pk"
     lookup_value_converter = "uuid"
+    # "popular" walks ingredient_popular_idx.
+    orderings = {
+        "name": ("name", "id"),
+        "popular": ("-active_recipe_count", "name", "id"),
+    }
 
     def get_permissions(self):
         if self.action in ["create", "partial_update", "destroy"]:
@@ -107,62 +203,84 @@ class IngredientViewSet(viewsets.ViewSet):
 
     def get_queryset(self, request):
         if request.user.role == UserRole.ADMIN:
-            return Ingredient.objects.all()
-        return Ingredient.objects.filter(is_active=True)
+            return Ingredient.objects.filter(tenant_id=request.user.tenant_id)
+        return Ingredient.active_objects.filter(tenant_id=request.user.tenant_id)
+
+    def get_ordering(self, request):
+        return get_ordering(request, self.orderings)
 
+    @cache_response(INGREDIENTS_CACHE_NAMESPACE, embeds=(RECIPE_USAGE_CACHE_NAMESPACE,))
     def list(self, request):
-        ingredients = self.get_queryset(request)
+        ordering = self.get_ordering(request)
+        ingredients = self.get_queryset(request).order_by(*ordering)
 
-        paginator = DefaultPagination()
+        paginator = get_paginator(request, ordering)
         paginated_qs = paginator.paginate_queryset(ingredients, request)
 
-        serializer = IngredientSerializer(
-            paginated_qs, many=True, context={"request": request}
-        )
+        serializer = self.get_role_serializer(request, paginated_qs, many=True)
         return paginator.get_paginated_response(serializer.data)
 
+    @action(detail=False, methods=["get"])
+    def autocomplete(self, request):
+        return autocomplete_response(request, Ingredient, INGREDIENTS_CACHE_NAMESPACE)
+
+    @conditional_detail(
+        INGREDIENTS_CACHE_NAMESPACE, embeds=(RECIPE_USAGE_CACHE_NAMESPACE,)
+    )
     def retrieve(self, request, pk=None):
         ingredients = self.get_queryset(request)
         ingredient = get_object_or_404(ingredients, pk=pk)
-        serializer = IngredientSerializer(ingredient, context={"request": request})
+        serializer = self.get_role_serializer(request, ingredient)
         return Response(serializer.data, status=status.HTTP_200_OK)
 
     def create(self, request):
         name = request.data.get("name")
 
-        old = Ingredient.objects.filter(name=name, is_active=False).first()
+        if name:
+            restore_archived(Ingredient, tenant_id=request.user.tenant_id, name=name)
+
+        old = Ingredient.objects.filter(
+            tenant_id=request.user.tenant_id, name=name, is_active=False
+        ).first()
 
         if old:
             old.is_active = True
             old.deleted_at = None
             old.save()
-            serializer = IngredientSerializer(old, context={"request": request})
+            bump_version(
+                old.tenant_id, INGREDIENTS_CACHE_NAMESPACE, RECIPES_CACHE_NAMESPACE
+            )
+            serializer = self.get_role_serializer(request, old)
             return Response(serializer.data, status=status.HTTP_201_CREATED)
 
-        serializer = IngredientSerializer(
-            data=request.data, context={"request": request}
-        )
+        serializer = self.get_role_serializer(request, data=request.data)
         serializer.is_valid(raise_exception=True)
-        serializer.save()
+        serializer.save(tenant=request.user.tenant)
+        bump_version(
+            request.user.tenant_id, INGREDIENTS_CACHE_NAMESPACE, RECIPES_CACHE_NAMESPACE
+        )
         return Response(serializer.data, status=status.HTTP_201_CREATED)
 
     def partial_update(self, request, pk=None):
-        ingredient = get_object_or_404(Ingredient, pk=pk, is_active=True)
-        serializer = IngredientSerializer(
-            ingredient, data=request.data, partial=True, context={"request": request}
+        ingredient = get_object_or_404(
+            Ingredient.active_objects, pk=pk, tenant_id=request.user.tenant_id
+        )
+        serializer = self.get_role_serializer(
+            request, ingredient, data=request.data, partial=True
         )
         serializer.is_valid(raise_exception=True)
         serializer.save()
+        bump_version(
+            ingredient.tenant_id, INGREDIENTS_CACHE_NAMESPACE, RECIPES_CACHE_NAMESPACE
+        )
         return Response(serializer.data, status=status.HTTP_200_OK)
 
     def destroy(self, request, pk=None):
-        ingredient = get_object_or_404(Ingredient, pk=pk, is_active=True)
-
-        is_used = RecipeIngredient.objects.filter(
-            ingredient=ingredient, recipe__is_active=True
-        ).exists()
+        ingredient = get_object_or_404(
+            Ingredient.active_objects, pk=pk, tenant_id=request.user.tenant_id
+        )
 
-        if is_used:
+        if ingredient.active_recipe_count > 0:
             return Response(
                 {
                     "error": "Cannot delete ingredient because it is used in one or more active recipes."
@@ -173,15 +291,43 @@ class IngredientViewSet(viewsets.ViewSet):
         ingredient.is_active = False
         ingredient.deleted_at = timezone.now()
         ingredient.save()
+        bump_version(
+            ingredient.tenant_id, INGREDIENTS_CACHE_NAMESPACE, RECIPES_CACHE_NAMESPACE
+        )
 
         return Response(status=status.HTTP_204_NO_CONTENT)
 
 
-class RecipeViewSet(viewsets.ViewSet):
+class RecipeViewSet(AdminSerializerMixin, ReplicaReadMixin, viewsets.ViewSet):
+    serializer_class = RecipeSerializer
+    admin_serializer_class = AdminRecipeSerializer
+    cursor_ordering = ("-created_at", "-id")
+    # Read paths render through the hand-written fast serializers, which
+    # choose the admin field set themselves.
+    list_serializer_class = FastRecipeListSerializer
+    retrieve_serializer_class = FastRecipeSerializer
+    # Columns the list representation renders; preparation_steps and the
+    # other wide columns are never loaded for listings. Cuisines and
+    # ingredients come from the in-process tenant catalogs.
+    list_columns = (
+        "id",
+        "user",
+        "cuisine",
+        "ingredient_ids",
+        "name",
+        "description",
+        "cooking_time",
+        "sharing_status",
+        "created_at",
+        "is_active",
+        "deleted_at",
+    )
 
     def get_permissions(self):
         if self.action in ["partial_update", "destroy"]:
             permission_classes = [IsAuthenticated, IsOwnerOrAdmin]
+        elif self.action in ["export", "stats"]:
+            permission_classes = [IsAuthenticated, IsAdmin]
         elif self.action == "retrieve":
             permission_classes = [IsAuthenticated, CanViewRecipe]
         else:
@@ -189,23 +335,30 @@ class RecipeViewSet(viewsets.ViewSet):
 
         return [permission() for permission in permission_classes]
 
+    def handle_exception(self, exc):
+        if self.action == "export":
+            # The streaming renderers cannot render an error body, so errors
+            # raised before or by the export (401, 403, 406, ...) use JSON.
+            self.request.accepted_renderer = JSONRenderer()
+            self.request.accepted_media_type = JSONRenderer.media_type
+        return super().handle_exception(exc)
+
     def get_queryset(self, request):
         user = request.user
 
         if user.role == UserRole.ADMIN:
-            return Recipe.objects.all()
+            return Recipe.objects.filter(tenant_id=user.tenant_id)
         else:
-            return Recipe.objects.filter(
-                Q(user=user) | Q(sharing_status="PUBLIC"),
-                is_active=True,
+            # Each side of the OR matches one partial index
+            # (recipe_user_active_idx / recipe_tenant_shared_idx), so
+            # Postgres can combine two index scans instead of a seq scan.
+            return Recipe.active_objects.filter(
+                Q(user=user)
+                | Q(tenant_id=user.tenant_id, sharing_status=SharingStatus.PUBLIC)
             )
 
-    def list(self, request):
-        recipes = (
-            self.get_queryset(request)
-            .select_related("user", "cuisine")
-            .prefetch_related("ingredients")
-        )
+    def get_list_queryset(self, request):
+        recipes = self.get_queryset(request).only(*self.list_columns)
 
         cuisine_ids_param = request.query_params.get("cuisine_id")
         if cuisine_ids_param:
@@ -229,54 +382,179 @@ class RecipeViewSet(viewsets.ViewSet):
                 if ingredient_id.strip()
             ]
 
-            recipes = recipes.filter(
-                recipe_ingredients__ingredient__id__in=ingredient_ids
-            ).distinct()
+            ingredient_ids = list(dict.fromkeys(ingredient_ids))
 
-        paginator = DefaultPagination()
-        page = paginator.paginate_queryset(recipes, request)
+            ingredient_match = request.query_params.get(
+                "ingredient_match", IngredientMatch.ANY
+            )
+            if ingredient_match not in IngredientMatch.values:
+                raise ValidationError(
+                    {
+                        "ingredient_match": f"Must be one of: {', '.join(IngredientMatch.values)}."
+                    }
+                )
+
+            # Recipe.ingredient_ids mirrors recipe_ingredients, so both modes
+            # are GIN-indexed array operators with no join or DISTINCT.
+            if ingredient_match == IngredientMatch.ALL:
+                recipes = recipes.filter(ingredient_ids__contains=ingredient_ids)
+            else:
+                recipes = recipes.filter(ingredient_ids__overlap=ingredient_ids)
+
+        search = request.query_params.get("search", "").strip()
+        if search:
+            # Keyset pagination would replace the relevance ordering with
+            # cursor_ordering, so ranked results are paged by page number.
+            if uses_cursor(request):
+                raise ValidationError(
+                    {"search": "Cursor pagination is not supported with search."}
+                )
+            query = SearchQuery(search, config="english", search_type="websearch")
+            recipes = (
+                recipes.filter(search_vector=query)
+                .annotate(rank=SearchRank(F("search_vector"), query))
+                .order_by("-rank", "-created_at", "-id")
+            )
 
-        serializer = RecipeListSerializer(page, many=True, context={"request": request})
-        return paginator.get_paginated_response(serializer.data)
+        return recipes
 
-    def retrieve(self, request, pk=None):
-        qs = (
+    def get_list_serializer_context(self, request):
+        tenant_id = request.user.tenant_id
+        return {
+            "request": request,
+            "cuisines": cuisine_catalog.get(tenant_id),
+            "ingredients": ingredient_catalog.get(tenant_id),
+        }
+
+    def get_detail_queryset(self, request):
+        return (
             self.get_queryset(request)
             .select_related("user", "cuisine")
             .prefetch_related("recipe_ingredients__ingredient")
         )
 
-        recipe = get_object_or_404(qs, pk=pk)
+    @cache_response(RECIPES_CACHE_NAMESPACE, per_user=True)
+    def list(self, request):
+        recipes = self.get_list_queryset(request)
+
+        paginator = get_paginator(request, self.cursor_ordering)
+        page = paginator.paginate_queryset(recipes, request)
+
+        serializer = self.list_serializer_class(
+            page, many=True, context=self.get_list_serializer_context(request)
+        )
+        return paginator.get_paginated_response(serializer.data)
+
+    @conditional_detail(
+        RECIPES_CACHE_NAMESPACE,
+        embeds=(CUISINES_CACHE_NAMESPACE, INGREDIENTS_CACHE_NAMESPACE),
+    )
+    def retrieve(self, request, pk=None):
+        recipe = get_object_or_404(self.get_detail_queryset(request), pk=pk)
 
         self.check_object_permissions(request, recipe)
-        serializer = RecipeSerializer(recipe, context={"request": request})
+        serializer = self.retrieve_serializer_class(
+            recipe, context={"request": request}
+        )
         return Response(serializer.data, status=status.HTTP_200_OK)
 
     def create(self, request):
-        serializer = RecipeSerializer(data=request.data, context={"request": request})
+        serializer = self.get_role_serializer(request, data=request.data)
         serializer.is_valid(raise_exception=True)
-        serializer.save(user=request.user)
+        serializer.save(user=request.user, tenant=request.user.tenant)
+        bump_version(request.user.tenant_id, RECIPES_CACHE_NAMESPACE)
 
         return Response(serializer.data, status=status.HTTP_201_CREATED)
 
+    @action(
+        detail=False, methods=["get"], renderer_classes=[NDJSONRenderer, CSVRenderer]
+    )
+    def export(self, request):
+        recipes = Recipe.objects.filter(tenant_id=request.user.tenant_id).order_by(
+            "created_at", "id"
+        )
+        # The rows are read after the view returns, so fix the database the
+        # request was routed to now.
+        recipes = recipes.using(recipes.db)
+        rows = iter_export_rows(recipes, EXPORT_CHUNK_SIZE)
+
+        renderer = request.accepted_renderer
+        if renderer.format == CSVRenderer.format:
+            content = stream_csv(rows)
+        else:
+            content = stream_ndjson(rows)
+
+        response = StreamingHttpResponse(
+            content, content_type=f"{renderer.media_type}; charset={renderer.charset}"
+        )
+        response["Content-Disposition"] = (
+            f'attachment; filename="recipes.{renderer.format}"'
+        )
+        return response
+
+    @action(detail=False, methods=["get"])
+    def stats(self, request):
+        # Served from the stats materialized view; refreshed_at tells the
+        # dashboard how old the figures are.
+        return Response(tenant_stats(request.user.tenant_id), status=status.HTTP_200_OK)
+
+    @action(detail=False, methods=["post"])
+    def bulk(self, request):
+        items = request.data
+        if not isinstance(items, list) or not items:
+            raise ValidationError({"detail": "Expected a non-empty list of recipes."})
+
+        if len(items) > BULK_CREATE_MAX_ITEMS:
+            raise ValidationError(
+                {"detail": f"At most {BULK_CREATE_MAX_ITEMS} recipes per request."}
+            )
+
+        results = bulk_create_recipes(items, request.user)
+        created = sum(1 for result in results if "errors" not in result)
+
+        if created:
+            bump_version(request.user.tenant_id, RECIPES_CACHE_NAMESPACE)
+
+        if created == len(results):
+            response_status = status.HTTP_201_CREATED
+        elif created:
+            response_status = status.HTTP_207_MULTI_STATUS
+        else:
+            response_status = status.HTTP_400_BAD_REQUEST
+
+        return Response(
+            {"created": created, "failed": len(results) - created, "results": results},
+            status=response_status,
+        )
+
     def partial_update(self, request, pk=None):
-        recipe = get_object_or_404(Recipe, pk=pk, is_active=True)
+        recipe = get_object_or_404(
+            Recipe.active_objects, pk=pk, tenant_id=request.user.tenant_id
+        )
         self.check_object_permissions(request, recipe)
 
-        serializer = RecipeSerializer(
-            recipe, data=request.data, partial=True, context={"request": request}
+        serializer = self.get_role_serializer(
+            request, recipe, data=request.data, partial=True
         )
         serializer.is_valid(raise_exception=True)
         serializer.save()
+        bump_version(recipe.tenant_id, RECIPES_CACHE_NAMESPACE)
 
         return Response(serializer.data, status=status.HTTP_200_OK)
 
     def destroy(self, request, pk=None):
-        recipe = get_object_or_404(Recipe, pk=pk, is_active=True)
+        recipe = get_object_or_404(
+            Recipe.active_objects, pk=pk, tenant_id=request.user.tenant_id
+        )
         self.check_object_permissions(request, recipe)
 
-        recipe.is_active = False
-        recipe.deleted_at = timezone.now()
-        recipe.save()
+        with transaction.atomic():
+            # Re-read under the lock so a concurrent edit or delete is
+            # uncounted exactly once.
+            recipes = Recipe.active_objects.select_for_update().filter(pk=recipe.pk)
+            usage = list(recipes.values_list("cuisine_id", "ingredient_ids"))
+            recipes.soft_delete()
+            recipes_deactivated(recipe.tenant_id, usage)
+        bump_version(recipe.tenant_id, RECIPES_CACHE_NAMESPACE)
 
         return Response(status=status.HTTP_204_NO_CONTENT)
@@ -0,0 +1,56 @@
+from django.db.models import Count, F, OuterRef, Subquery, Value
+from django.db.models.functions import Coalesce
+from recipes.models import Recipe
+from users.models import User
+from .models import Tenant
+
+
+def adjust_counts(tenant_id, **deltas):
+    """
+    Add `deltas`, keyed by counter field, to a tenant's maintained counts
+    with one F() update. Call it inside the transaction that changes the
+    counted rows.
+    """
+    updates = {name: F(name) + delta for name, delta in deltas.items() if delta}
+    if tenant_id is None or not updates:
+        return
+    Tenant.objects.filter(pk=tenant_id).update(**updates)
+
+
+def expected_count(rows):
+    return Coalesce(
+        Subquery(
+            rows.filter(tenant_id=OuterRef("pk"))
+            .order_by()
+            .values("tenant_id")
+            .annotate(total=Count("*"))
+            .values("total")
+        ),
+        Value(0),
+    )
+
+
+def expected_counts():
+    return {
+        "active_user_count": expected_count(User.objects.filter(is_active=True)),
+        "active_recipe_count": expected_count(Recipe.objects.filter(is_active=True)),
+    }
+
+
+def reconcile_counts():
+    """
+    Recompute every tenant's counts from the users and recipes tables,
+    catching changes made outside the maintained paths such as the Django
+    admin. Returns the number of tenants that had drifted.
+    """
+    expected = expected_counts()
+    stale = Tenant.objects.annotate(
+        **{f"expected_{name}": value for name, value in expected.items()}
+    ).exclude(
+        active_user_count=F("expected_active_user_count"),
+        active_recipe_count=F("expected_active_recipe_count"),
+    )
+    ids = list(stale.values_list("id", flat=True))
+    if not ids:
+        return 0
+    return Tenant.objects.filter(id__in=ids).update(**expected_counts())
@@ -0,0 +1,21 @@
+# Generated by Django 6.0 on 2026-10-17 15:02
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("tenants", "0001_initial"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="tenant",
+            index=models.Index(
+                condition=models.Q(("is_active", True)),
+                fields=["-created_at"],
+                name="tenant_active_created_idx",
+            ),
+        ),
+    ]
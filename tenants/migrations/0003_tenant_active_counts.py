@@ -0,0 +1,64 @@
+# Generated by Django 6.0 on 2026-10-17 16:20
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("tenants", "0002_tenant_active_created_idx"),
+        ("users", "0006_alter_user_managers_user_tenant_active_idx"),
+        ("recipes", "0011_catalog_active_recipe_count"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="tenant",
+            name="active_user_count",
+            field=models.IntegerField(db_default=0, default=0),
+        ),
+        migrations.AddField(
+            model_name="tenant",
+            name="active_recipe_count",
+            field=models.IntegerField(db_default=0, default=0),
+        ),
+        migrations.RunSQL(
+            sql=[
+                """
+                UPDATE tenants_tenant
+                SET active_user_count = counts.users
+                FROM (
+                    SELECT tenant_id, count(*) AS users
+                    FROM users_user
+                    WHERE is_active AND tenant_id IS NOT NULL
+                    GROUP BY tenant_id
+                ) counts
+                WHERE counts.tenant_id = tenants_tenant.id
+                """,
+                """
+                UPDATE tenants_tenant
+                SET active_recipe_count = counts.recipes
+                FROM (
+                    SELECT tenant_id, count(*) AS recipes
+                    FROM recipes_recipe
+                    WHERE is_active
+                    GROUP BY tenant_id
+                ) counts
+                WHERE counts.tenant_id = tenants_tenant.id
+                """,
+            ],
+            reverse_sql=migrations.RunSQL.noop,
+        ),
+        migrations.AddIndex(
+            model_name="tenant",
+            index=models.Index(
+                fields=["active_user_count", "id"], name="tenant_user_count_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="tenant",
+            index=models.Index(
+                fields=["active_recipe_count", "id"], name="tenant_recipe_count_idx"
+            ),
+        ),
+    ]
@@ -8,6 +8,28 @@ class Tenant(BaseModel):
     name = models.CharField(max_length=255)
     is_active = models.BooleanField(default=True, db_default=True)
     is_premium = models.BooleanField(default=False, db_default=False)
+    # Maintained by tenants.counters and reconciled nightly.
+    active_user_count = models.IntegerField(default=0, db_default=0)
+    active_recipe_count = models.IntegerField(default=0, db_default=0)
+
+    class Meta:
+        indexes = [
+            models.Index(
+                fields=["-created_at"],
+                condition=models.Q(is_active=True),
+                name="tenant_active_created_idx",
+            ),
+            # Serve the listing's count filters and orderings in either
+            # direction.
+            models.Index(
+                fields=["active_user_count", "id"],
+                name="tenant_user_count_idx",
+            ),
+            models.Index(
+                fields=["active_recipe_count", "id"],
+                name="tenant_recipe_count_idx",
+            ),
+        ]
 
     def __str__(self):
         return self.name
@@ -11,11 +11,20 @@ class TenantSerializer(serializers.ModelSerializer):
             "name",
             "is_active",
             "is_premium",
+            "active_user_count",
+            "active_recipe_count",
+            "created_at",
+            "updated_at",
+            "deleted_at",
+        ]
+        read_only_fields = [
+            "id",
+            "active_user_count",
+            "active_recipe_count",
             "created_at",
             "updated_at",
             "deleted_at",
         ]
-        read_only_fields = ["id", "created_at", "updated_at", "deleted_at"]
 
     def validate_name(self, value):
         if not value or not value.strip():
@@ -24,7 +33,10 @@ class TenantSerializer(serializers.ModelSerializer):
 
 
 class TenantListSerializer(serializers.ModelSerializer):
-    user_count = serializers.IntegerField(read_only=True)
+    user_count = serializers.IntegerField(source="active_user_count", read_only=True)
+    recipe_count = serializers.IntegerField(
+        source="active_recipe_count", read_only=True
+    )
 
     class Meta:
         model = Tenant
@@ -34,6 +46,7 @@ class TenantListSerializer(serializers.ModelSerializer):
             "is_active",
             "is_premium",
             "user_count",
+            "recipe_count",
             "created_at",
         ]
         read_only_fields = fields
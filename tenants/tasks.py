@@ -0,0 +1,7 @@
+from celery import shared_task
+from .counters import reconcile_counts
+
+
+@shared_task
+def reconcile_tenant_counts():
+    return reconcile_counts()
@@ -1,3 +1,95 @@
-from django.test import TestCase
+from django.test import TestCase, override_settings
+from rest_framework.test import APIClient
+from recipes.models import Recipe
+from users.enums import UserRole
+from users.models import User
+from .counters import reconcile_counts
+from .models import Tenant
 
-# Create your tests here.
+LOCMEM_CACHES = {
+    "default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"}
+}
+
+
+@override_settings(CACHES=LOCMEM_CACHES)
+class TenantCounterTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.tenant = Tenant.objects.create(name="Tenant")
+        cls.other = Tenant.objects.create(name="Other")
+        cls.admin = User.objects.create_user(
+            username="admin",
+            email="admin@example.com",
+            password="!",
+            tenant=cls.tenant,
+            role=UserRole.ADMIN,
+        )
+        cls.cook = User.objects.create_user(
+            username="cook", email="cook@example.com", password="!", tenant=cls.tenant
+        )
+        cls.superadmin = User.objects.create_user(
+            username="root", email="root@example.com", password="!", is_superadmin=True
+        )
+
+    def setUp(self):
+        # Rows created directly are only counted by the reconciliation.
+        reconcile_counts()
+        self.client = APIClient()
+
+    def counts(self, tenant):
+        tenant.refresh_from_db()
+        return tenant.active_user_count, tenant.active_recipe_count
+
+    def test_counts_follow_recipe_and_user_writes(self):
+        self.assertEqual(self.counts(self.tenant), (2, 0))
+
+        self.client.force_authenticate(self.cook)
+        response = self.client.post(
+            "/api/v1/recipes/",
+            {"name": "Soup", "preparation_steps": "Mix.", "cooking_time": 10},
+            format="json",
+        )
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(self.counts(self.tenant), (2, 1))
+
+        response = self.client.delete(f"/api/v1/recipes/{response.data['id']}/")
+        self.assertEqual(response.status_code, 204)
+        self.assertEqual(self.counts(self.tenant), (2, 0))
+
+        User.objects.filter(pk=self.cook.pk).soft_delete()
+        reconcile_counts()
+        self.assertEqual(self.counts(self.tenant), (1, 0))
+
+        self.client.force_authenticate(self.admin)
+        response = self.client.patch(
+            f"/api/v1/users/{self.cook.pk}/", {"is_active": True}, format="json"
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(self.counts(self.tenant), (2, 0))
+        self.assertEqual(self.counts(self.other), (0, 0))
+
+        self.assertEqual(reconcile_counts(), 0)
+
+    def test_listing_orders_and_filters_by_the_counts(self):
+        Recipe.objects.create(
+            tenant=self.tenant,
+            user=self.cook,
+            name="Soup",
+            preparation_steps="Mix.",
+            cooking_time=10,
+        )
+        reconcile_counts()
+        self.client.force_authenticate(self.superadmin)
+
+        response = self.client.get("/api/v1/tenants/?ordering=-recipe_count")
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(
+            [
+                (row["name"], row["user_count"], row["recipe_count"])
+                for row in response.data["results"]
+            ],
+            [("Tenant", 2, 1), ("Other", 0, 0)],
+        )
+
+        response = self.client.get("/api/v1/tenants/?min_recipes=1")
+        self.assertEqual([row["name"] for row in response.data["results"]], ["Tenant"])
@@ -1,26 +1,41 @@
 from django.utils import timezone
 from django.shortcuts import get_object_or_404
-from django.db.models import Count, Q
 from rest_framework.response import Response
 from rest_framework import viewsets, status
 from rest_framework.permissions import IsAuthenticated
+from rest_framework.exceptions import ValidationError
 from .models import Tenant
 from .permissions import IsSuperAdmin
 from .serializers import TenantSerializer, TenantListSerializer
-from common.pagination import DefaultPagination
+from common.db_router import ReplicaReadMixin
+from common.pagination import DefaultPagination, get_ordering
 
 
-class TenantViewSet(viewsets.ViewSet):
+class TenantViewSet(ReplicaReadMixin, viewsets.ViewSet):
 
     permission_classes = [IsAuthenticated, IsSuperAdmin]
+    # The count orderings and the min_* filters walk tenant_user_count_idx
+    # and tenant_recipe_count_idx.
+    orderings = {
+        "-created_at": ("-created_at", "-id"),
+        "created_at": ("created_at", "id"),
+        "-user_count": ("-active_user_count", "-id"),
+        "user_count": ("active_user_count", "id"),
+        "-recipe_count": ("-active_recipe_count", "-id"),
+        "recipe_count": ("active_recipe_count", "id"),
+    }
+    count_filters = {
+        "min_users": "active_user_count__gte",
+        "max_users": "active_user_count__lte",
+        "min_recipes": "active_recipe_count__gte",
+        "max_recipes": "active_recipe_count__lte",
+    }
 
     def get_queryset(self):
         return Tenant.objects.all()
 
     def list(self, request):
-        tenants = self.get_queryset().annotate(
-            user_count=Count("users", filter=Q(users__is_active=True))
-        )
+        tenants = self.get_queryset()
 
         is_active = request.query_params.get("is_active")
         if is_active is not None:
@@ -36,7 +51,16 @@ class TenantViewSet(viewsets.ViewSet):
             elif is_premium.lower() == "false":
                 tenants = tenants.filter(is_premium=False)
 
-        tenants = tenants.order_by("-created_at")
+        for param, lookup in self.count_filters.items():
+            value = request.query_params.get(param)
+            if value is None:
+                continue
+            try:
+                tenants = tenants.filter(**{lookup: int(value)})
+            except ValueError:
+                raise ValidationError({param: "A valid integer is required."})
+
+        tenants = tenants.order_by(*get_ordering(request, self.orderings))
 
         paginator = DefaultPagination()
         paginated_qs = paginator.paginate_queryset(tenants, request)
@@ -74,7 +98,7 @@ class TenantViewSet(viewsets.ViewSet):
         return Response(serializer.data, status=status.HTTP_201_CREATED)
 
     def partial_update(self, request, pk=None):
-        tenant = get_object_or_404(Tenant, pk=pk, is_active=True)
+        tenant = get_object_or_404(Tenant.active_objects, pk=pk)
 
         serializer = TenantSerializer(tenant, data=request.data, partial=True)
         serializer.is_valid(raise_exception=True)
@@ -83,14 +107,12 @@ class TenantViewSet(viewsets.ViewSet):
         return Response(serializer.data, status=status.HTTP_200_OK)
 
     def destroy(self, request, pk=None):
-        tenant = get_object_or_404(Tenant, pk=pk, is_active=True)
-
-        active_users_count = tenant.users.filter(is_active=True).count()
+        tenant = get_object_or_404(Tenant.active_objects, pk=pk)
 
-        if active_users_count > 0:
+        if tenant.active_user_count > 0:
             return Response(
                 {
-                    "error": f"Cannot delete tenant because it has {active_users_count} active user(s). Please remove or delete users first."
+                    "error": f"Cannot delete tenant because it has {tenant.active_user_count} active user(s). Please remove or delete users first."
                 },
                 status=status.HTTP_400_BAD_REQUEST,
             )
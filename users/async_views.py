@@ -0,0 +1,23 @@
+from django.shortcuts import aget_object_or_404
+from rest_framework.permissions import IsAuthenticated
+from common.async_views import AsyncReadView
+from .enums import UserRole
+from .models import User
+from .permissions import IsOwnerOrAdmin
+from .views import UserViewSet
+
+
+class AsyncUserView(AsyncReadView):
+    viewset_class = UserViewSet
+    permission_classes = [IsAuthenticated, IsOwnerOrAdmin]
+
+    async def retrieve(self, request, pk):
+        if request.user.role == UserRole.ADMIN:
+            user = await aget_object_or_404(User, pk=pk)
+        else:
+            user = await aget_object_or_404(User.active_objects, pk=pk)
+
+        self.check_object_permissions(request, user)
+
+        serializer = self.viewset.get_role_serializer(request, user)
+        return serializer.data
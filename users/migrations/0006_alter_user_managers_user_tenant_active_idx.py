@@ -0,0 +1,28 @@
+# Generated by Django 6.0 on 2026-10-17 15:02
+
+import users.models
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("users", "0005_alter_user_role"),
+    ]
+
+    operations = [
+        migrations.AlterModelManagers(
+            name="user",
+            managers=[
+                ("objects", users.models.UserManager()),
+            ],
+        ),
+        migrations.AddIndex(
+            model_name="user",
+            index=models.Index(
+                condition=models.Q(("is_active", True)),
+                fields=["tenant"],
+                name="user_tenant_active_idx",
+            ),
+        ),
+    ]
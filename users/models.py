@@ -1,10 +1,15 @@
 import uuid
 from django.contrib.auth.models import AbstractUser
+from django.contrib.auth.models import UserManager as AuthUserManager
 from django.db import models
-from common.models import BaseModel
+from common.models import BaseModel, SoftDeleteQuerySet
 from .enums import UserRole
 
 
+class UserManager(AuthUserManager.from_queryset(SoftDeleteQuerySet)):
+    pass
+
+
 class User(AbstractUser, BaseModel):
     id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
 
@@ -32,6 +37,18 @@ class User(AbstractUser, BaseModel):
         related_name="deleted_users",
     )
 
+    objects = UserManager()
+
+    class Meta(AbstractUser.Meta):
+        indexes = [
+            # Active members of a tenant, for user counts and listings.
+            models.Index(
+                fields=["tenant"],
+                condition=models.Q(is_active=True),
+                name="user_tenant_active_idx",
+            ),
+        ]
+
     def __str__(self):
         if self.tenant:
             return f"{self.email} ({self.tenant.name})"
@@ -1,9 +1,10 @@
 from rest_framework import serializers
 from django.contrib.auth.password_validation import validate_password
 from django.core.cache import cache
+from django.db import transaction
 from rest_framework_simplejwt.tokens import RefreshToken
+from tenants.counters import adjust_counts
 from .models import User
-from .enums import UserRole
 
 
 class RegisterSerializer(serializers.Serializer):
@@ -72,6 +73,7 @@ class RegisterSerializer(serializers.Serializer):
 
         return data
 
+    @transaction.atomic
     def create(self, validated_data):
         validated_data.pop("confirm_password")
         password = validated_data.pop("password")
@@ -100,11 +102,13 @@ class RegisterSerializer(serializers.Serializer):
                     "deleted_by",
                 ]
             )
+            adjust_counts(user.tenant_id, active_user_count=1)
             return user
 
         user = User(**validated_data)
         user.set_password(password)
         user.save()
+        adjust_counts(user.tenant_id, active_user_count=1)
         return user
 
 
@@ -295,12 +299,13 @@ class UserSerializer(serializers.ModelSerializer):
             "updated_at",
         ]
 
-    def __init__(self, *args, **kwargs):
-        super().__init__(*args, **kwargs)
-        request = self.context.get("request")
-        if request and request.user.role == UserRole.ADMIN:
-            self.fields["is_active"] = serializers.BooleanField()
-            self.fields["deleted_at"] = serializers.DateTimeField(read_only=True)
+
+class AdminUserSerializer(UserSerializer):
+    is_active = serializers.BooleanField()
+    deleted_at = serializers.DateTimeField(read_only=True)
+
+    class Meta(UserSerializer.Meta):
+        fields = UserSerializer.Meta.fields + ["is_active", "deleted_at"]
 
 
 class ChangePasswordSerializer(serializers.Serializer):
@@ -14,6 +14,7 @@ from .views import (
     LoginVerifyOTPAPIView,
     LoginResendOTPAPIView,
 )
+from .async_views import AsyncUserView
 
 router = DefaultRouter()
 router.register("users", UserViewSet, basename="user")
@@ -44,5 +45,6 @@ urlpatterns = [
         ResetPasswordPage.as_view(),
         name="reset_password",
     ),
+    path("async/users/<uuid:pk>/", AsyncUserView.as_view(), name="async_user_detail"),
     path("", include(router.urls)),
 ]
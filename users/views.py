@@ -8,13 +8,17 @@ from rest_framework import status, viewsets
 from rest_framework.permissions import IsAuthenticated
 from rest_framework_simplejwt.tokens import RefreshToken
 from rest_framework.exceptions import ValidationError
+from django.db import transaction
+from recipes.counters import recipes_deactivated
 from recipes.models import Recipe
+from tenants.counters import adjust_counts
 from .serializers import (
     RegisterSerializer,
     LoginSerializer,
     TokenRefreshSerializer,
     ChangePasswordSerializer,
     UserSerializer,
+    AdminUserSerializer,
     VerifyOTPSerializer,
     ResendOTPSerializer,
     ForgotPasswordSerializer,
@@ -22,7 +26,11 @@ from .serializers import (
     LoginVerifyOTPSerializer,
     LoginResendOTPSerializer,
 )
+from common.db_router import ReplicaReadMixin
+from common.mixins import AdminSerializerMixin
 from common.pagination import DefaultPagination
+from common.cache import bump_version
+from common.constants import RECIPES_CACHE_NAMESPACE
 from .permissions import IsAdmin, IsOwnerOrAdmin, CanDeleteUser
 from .models import User
 from .tasks import (
@@ -226,7 +234,10 @@ class TokenRefreshAPIView(APIView):
         return Response(serializer.validated_data, status=status.HTTP_200_OK)
 
 
-class UserViewSet(viewsets.ViewSet):
+class UserViewSet(AdminSerializerMixin, ReplicaReadMixin, viewsets.ViewSet):
+    serializer_class = UserSerializer
+    admin_serializer_class = AdminUserSerializer
+
     def get_permissions(self):
         if self.action in ["list", "partial_update"]:
             permission_classes = [IsAuthenticated, IsAdmin]
@@ -241,88 +252,97 @@ class UserViewSet(viewsets.ViewSet):
     def get_queryset(self, request):
         if request.user.role == UserRole.ADMIN:
             return User.objects.all()
-        return User.objects.filter(id=request.user.id, is_active=True)
+        return User.active_objects.filter(id=request.user.id)
 
     def list(self, request):
         users = self.get_queryset(request)
 
         status_param = request.query_params.get("status")
         if status_param == "active":
-            users = users.filter(is_active=True)
+            users = users.active()
         elif status_param == "deleted":
-            users = users.filter(is_active=False)
+            users = users.deleted()
 
         paginator = DefaultPagination()
         paginated_qs = paginator.paginate_queryset(users, request)
-        serializer = UserSerializer(
-            paginated_qs, many=True, context={"request": request}
-        )
+        serializer = self.get_role_serializer(request, paginated_qs, many=True)
         return paginator.get_paginated_response(serializer.data)
 
     def retrieve(self, request, pk=None):
         if request.user.role == UserRole.ADMIN:
             user = get_object_or_404(User, pk=pk)
         else:
-            user = get_object_or_404(User, pk=pk, is_active=True)
+            user = get_object_or_404(User.active_objects, pk=pk)
 
         self.check_object_permissions(request, user)
 
-        serializer = UserSerializer(user, context={"request": request})
+        serializer = self.get_role_serializer(request, user)
         return Response(serializer.data, status=status.HTTP_200_OK)
 
     def partial_update(self, request, pk=None):
-        user = get_object_or_404(User, pk=pk)
-
         is_active = request.data.get("is_active", None)
         if str(is_active).lower() not in ["true"]:
             raise ValidationError({"detail": "To restore a user, set is_active=true."})
 
-        if user.is_active:
-            return Response(
-                {"detail": "User is already active."},
-                status=status.HTTP_400_BAD_REQUEST,
-            )
+        with transaction.atomic():
+            # Locked so concurrent restores count the user back in once.
+            user = get_object_or_404(User.objects.select_for_update(), pk=pk)
 
-        user.is_active = True
-        user.deleted_at = None
-        user.save()
+            if user.is_active:
+                return Response(
+                    {"detail": "User is already active."},
+                    status=status.HTTP_400_BAD_REQUEST,
+                )
 
-        serializer = UserSerializer(user, context={"request": request})
+            user.is_active = True
+            user.deleted_at = None
+            user.save()
+            adjust_counts(user.tenant_id, active_user_count=1)
+
+        serializer = self.get_role_serializer(request, user)
         return Response(serializer.data, status=status.HTTP_200_OK)
 
     def destroy(self, request, pk=None):
-        user = get_object_or_404(User, pk=pk)
-        self.check_object_permissions(request, user)
+        with transaction.atomic():
+            # Locked so concurrent deletes count the user out once.
+            user = get_object_or_404(User.objects.select_for_update(), pk=pk)
+            self.check_object_permissions(request, user)
 
-        if not user.is_active:
-            return Response(
-                {"error": "User is already deleted."},
-                status=status.HTTP_400_BAD_REQUEST,
-            )
+            if not user.is_active:
+                return Response(
+                    {"error": "User is already deleted."},
+                    status=status.HTTP_400_BAD_REQUEST,
+                )
 
-        now = timezone.now()
+            now = timezone.now()
 
-        user.is_active = False
-        user.deleted_at = now
-        user.deleted_by = request.user
+            user.is_active = False
+            user.deleted_at = now
+            user.deleted_by = request.user
 
-        if request.user.role == UserRole.ADMIN:
-            eta = now + timedelta(days=90)
-        else:
-            user.is_email_verified = False
-            eta = now + timedelta(days=7)
+            if request.user.role == UserRole.ADMIN:
+                eta = now + timedelta(days=90)
+            else:
+                user.is_email_verified = False
+                eta = now + timedelta(days=7)
+
+            user.save()
+            adjust_counts(user.tenant_id, active_user_count=-1)
 
-        user.save()
+            recipes = Recipe.active_objects.select_for_update().filter(user=user)
+            usage = list(recipes.values_list("cuisine_id", "ingredient_ids"))
+            recipes.update(
+                is_active=False,
+                deleted_at=now,
+                updated_at=now,
+            )
+            recipes_deactivated(user.tenant_id, usage)
 
         hard_delete_user.apply_async(
             args=[str(user.id)],
             eta=eta,
         )
-
-        Recipe.objects.filter(user=user, is_active=True).update(
-            is_active=False,
-            deleted_at=now,
-        )
+        bump_version(user.tenant_id, RECIPES_CACHE_NAMESPACE)
 
         return Response(status=status.HTTP_204_NO_CONTENT)
 